@@ -1,59 +1,117 @@
 import os
 import re
 import json
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+# 优先使用 orjson（C实现，解析更快）；其 JSONDecodeError 是 json.JSONDecodeError 的子类
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# 县/镇名通常出现在“访谈”和“村”或“脱贫户”之间
+_COUNTY_RE = re.compile(r'访谈(.+?)(?:村|脱贫户)')
 
 def extract_county_from_filename(filename):
     """
     从访谈文件名中提取县/镇名称。
     假定县/镇信息通常出现在“访谈”和“村”或“脱贫户”之间。
     """
-    match = re.search(r'访谈(.+?)(村|脱贫户)', filename)
+    match = _COUNTY_RE.search(filename)
     if match:
         return match.group(1).strip()
     return "未知县镇"
 
-def analyze_counties(summary_dir):
+def _dedup_key(item):
+    """
+    去重集合使用的键：可哈希的值直接使用；
+    字典、列表等不可哈希的值（如模型返回的 {"措施": ..., "佐证": ...}）按排序键后的JSON比较
+    """
+    try:
+        hash(item)
+        return item
+    except TypeError:
+        return ("json", json.dumps(item, sort_keys=True, ensure_ascii=False, default=str))
+
+def _load_summary(filepath):
+    """
+    读取并解析单个JSON文件，返回 (data, error)。
+    异常不在线程内打印，交给主线程按文件顺序统一输出。
+    """
+    try:
+        # JSON 规定为 UTF-8，直接按字节读取交给解析器
+        with open(filepath, 'rb') as f:
+            return _json_loads(f.read()), None
+    except Exception as e:
+        return None, e
+
+def analyze_counties(summary_dir, max_workers=16):
     """
     遍历指定目录下的减贫措施分析JSON文件，提取县名和分析结果。
+    文件读取和解析由线程池并行完成，汇总在主线程中按文件顺序进行。
     """
+    with os.scandir(summary_dir) as it:
+        entries = [entry for entry in it if entry.name.endswith("_poverty_summary.json")]
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        loaded = list(executor.map(_load_summary, [entry.path for entry in entries]))
+    
     county_data = {}
-    for filename in os.listdir(summary_dir):
-        if filename.endswith("_poverty_summary.json"):
-            filepath = os.path.join(summary_dir, filename)
-            county_name = extract_county_from_filename(filename)
+    # 与 county_data 平行的去重集合，避免在列表上做 O(n) 的 in 判断
+    seen = {}
+    for entry, (data, error) in zip(entries, loaded):
+        filepath = entry.path
+        if isinstance(error, json.JSONDecodeError):
+            print(f"Error decoding JSON from {filepath}: {error}")
+            continue
+        if error is not None:
+            print(f"Error processing file {filepath}: {error}")
+            continue
+        
+        county_name = extract_county_from_filename(entry.name)
+        
+        try:
+            if county_name not in county_data:
+                county_data[county_name] = {
+                    "summaries": [],
+                    "measures": {},
+                    "key_highlights": [],
+                    "living_changes": []
+                }
+                seen[county_name] = {
+                    "measures": defaultdict(set),
+                    "key_highlights": set()
+                }
+            county_seen = seen[county_name]
             
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                if county_name not in county_data:
-                    county_data[county_name] = {
-                        "summaries": [],
-                        "measures": {},
-                        "key_highlights": [],
-                        "living_changes": []
-                    }
-                
-                county_data[county_name]["summaries"].append(data.get("summary", ""))
-                
-                for dimension, measures_list in data.get("measures", {}).items():
-                    if isinstance(measures_list, list):
-                        if dimension not in county_data[county_name]["measures"]:
-                            county_data[county_name]["measures"][dimension] = []
-                        for measure in measures_list:
-                            if measure != "未提及" and measure not in county_data[county_name]["measures"][dimension]:
-                                county_data[county_name]["measures"][dimension].append(measure)
-                
-                for highlight in data.get("key_highlights", []):
-                    if highlight not in county_data[county_name]["key_highlights"]:
-                        county_data[county_name]["key_highlights"].append(highlight)
-                
-                county_data[county_name]["living_changes"].append(data.get("living_changes", ""))
-                
-            except json.JSONDecodeError as e:
-                print(f"Error decoding JSON from {filepath}: {e}")
-            except Exception as e:
-                print(f"Error processing file {filepath}: {e}")
+            county_data[county_name]["summaries"].append(data.get("summary", ""))
+            
+            for dimension, measures_list in data.get("measures", {}).items():
+                if isinstance(measures_list, list):
+                    if dimension not in county_data[county_name]["measures"]:
+                        county_data[county_name]["measures"][dimension] = []
+                    measures_seen = county_seen["measures"][dimension]
+                    for measure in measures_list:
+                        if measure == "未提及":
+                            continue
+                        key = _dedup_key(measure)
+                        if key not in measures_seen:
+                            measures_seen.add(key)
+                            county_data[county_name]["measures"][dimension].append(measure)
+            
+            highlights_seen = county_seen["key_highlights"]
+            for highlight in data.get("key_highlights", []):
+                key = _dedup_key(highlight)
+                if key not in highlights_seen:
+                    highlights_seen.add(key)
+                    county_data[county_name]["key_highlights"].append(highlight)
+            
+            county_data[county_name]["living_changes"].append(data.get("living_changes", ""))
+            
+        except Exception as e:
+            print(f"Error processing file {filepath}: {e}")
                 
     return county_data
 
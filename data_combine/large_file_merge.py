@@ -7,7 +7,17 @@
 
 import pandas as pd
 import os
-import glob
+import abc
+import codecs
+import collections
+import contextlib
+import csv
+import io
+import mmap
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 # 尝试导入pyreadstat（更好的Stata支持）
 try:
@@ -18,27 +28,429 @@ except ImportError:
     print("⚠️  提示: 安装 pyreadstat 可以获得更好的Stata文件支持")
     print("   安装命令: pip install pyreadstat")
 
-def merge_large_files(input_dir="test_data", output_file="merged.csv", chunksize=10000):
+# 尝试导入python-calamine（Rust实现的Excel解析器，流式读取更快更省内存）
+try:
+    from python_calamine import CalamineWorkbook
+    HAS_CALAMINE = True
+except ImportError:
+    HAS_CALAMINE = False
+
+# 尝试导入pyarrow（多线程C++ CSV解析，用于列顺序不同的CSV重新对齐）
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# 字节拷贝时每次读写的缓冲区大小
+COPY_BUFSIZE = 8 * 1024 * 1024
+
+# 分块处理时输出进度的最小间隔（秒）
+PROGRESS_INTERVAL = 2.0
+
+# 支持的输入文件扩展名及对应类型
+FILE_TYPES = {'.xlsx': 'Excel', '.xls': 'Excel', '.csv': 'CSV', '.dta': 'Stata'}
+
+# Excel单个工作表最大行数（含表头）
+EXCEL_MAX_ROWS = 1048576
+
+def _list_files(input_dir, exts):
+    """
+    单次扫描目录，返回扩展名匹配的文件路径（按路径排序）
+    
+    与glob一致，跳过以'.'开头的隐藏文件（如macOS的 ._xxx.csv）
+    """
+    with os.scandir(input_dir) as it:
+        return sorted(entry.path for entry in it
+                      if entry.name.endswith(exts) and not entry.name.startswith('.')
+                      and entry.is_file())
+
+def _fadvise(fd, advice_name):
+    """调用posix_fadvise给内核读取提示；不支持的平台（如Windows、macOS）上什么也不做"""
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, getattr(os, advice_name))
+    except OSError:
+        pass
+
+def _prefetch(path):
+    """
+    提示内核异步预读整个文件到页缓存
+    
+    在解析当前文件时调用，下一个文件的磁盘读取与当前文件的解析重叠
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        _fadvise(fd, 'POSIX_FADV_WILLNEED')
+    finally:
+        os.close(fd)
+
+def _drop_cache(path):
+    """文件读完后提示内核释放其页缓存，避免70GB输入把系统中其他缓存全部挤掉"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        _fadvise(fd, 'POSIX_FADV_DONTNEED')
+    finally:
+        os.close(fd)
+
+@contextlib.contextmanager
+def _open_seq(path):
+    """
+    以二进制顺序读方式打开输入文件
+    
+    打开时提示SEQUENTIAL（加大预读窗口），关闭前提示DONTNEED（释放页缓存）
+    """
+    with open(path, 'rb') as f:
+        _fadvise(f.fileno(), 'POSIX_FADV_SEQUENTIAL')
+        try:
+            yield f
+        finally:
+            _fadvise(f.fileno(), 'POSIX_FADV_DONTNEED')
+
+def _iter_excel_rows(file):
+    """
+    逐行读取Excel第一个工作表，第一行为表头
+    
+    优先使用python-calamine；未安装时xlsx用openpyxl只读模式流式读取，
+    都不会把整个工作簿加载成DataFrame
+    """
+    if HAS_CALAMINE:
+        workbook = CalamineWorkbook.from_path(file)
+        yield from workbook.get_sheet_by_index(0).iter_rows()
+    else:
+        import openpyxl
+        workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+        try:
+            yield from workbook.worksheets[0].iter_rows(values_only=True)
+        finally:
+            workbook.close()
+
+def _iter_frame_chunks(df, chunksize):
+    """
+    把已整体读入内存的DataFrame按chunksize分块
+    
+    安装了pyarrow时一次性转换为Arrow表后零拷贝切片为RecordBatch，
+    由_CsvOutput直接用Arrow写出；列类型混杂无法转换时退回iloc切片
+    """
+    if HAS_PYARROW:
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            table = None
+        if table is not None:
+            del df
+            yield from table.to_batches(max_chunksize=chunksize)
+            return
+    
+    for start in range(0, len(df), chunksize):
+        yield df.iloc[start:start + chunksize]
+
+def _iter_stata_chunks(file, chunksize):
+    """按chunksize行分块读取Stata文件，内存中同时只有一个分块"""
+    if HAS_PYREADSTAT:
+        # 使用pyreadstat（更快，支持更多特性）
+        for df, meta in pyreadstat.read_file_in_chunks(pyreadstat.read_dta, file, 
+                                                       chunksize=chunksize):
+            yield df
+    else:
+        # 使用pandas（基础支持）
+        with pd.read_stata(file, chunksize=chunksize) as reader:
+            yield from reader
+
+def _iter_excel_chunks(file, chunksize):
+    """把Excel行流按chunksize行一组转换成DataFrame，内存占用只与chunksize有关"""
+    if not HAS_CALAMINE and not file.endswith('.xlsx'):
+        # .xls 且没有calamine：只能整表读取
+        yield from _iter_frame_chunks(pd.read_excel(file), chunksize)
+        return
+    
+    rows = _iter_excel_rows(file)
+    columns = next(rows, None)
+    if columns is None:
+        return
+    
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= chunksize:
+            yield pd.DataFrame(batch, columns=columns)
+            batch = []
+    if batch:
+        yield pd.DataFrame(batch, columns=columns)
+
+class _Output(abc.ABC):
+    """输出文件基类：整个合并过程只打开一次，结束时关闭"""
+    
+    @abc.abstractmethod
+    def write(self, chunk):
+        """追加一个分块（pandas DataFrame 或 pyarrow RecordBatch）"""
+    
+    def close(self):
+        pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+class _CsvOutput(_Output):
+    """CSV输出：BOM和表头只写一次"""
+    
+    def __init__(self, output_file, bom=True):
+        self.f = open(output_file, 'wb', buffering=COPY_BUFSIZE)
+        if bom:
+            self.f.write(codecs.BOM_UTF8)
+        self.first_chunk = True
+    
+    def write(self, chunk):
+        if HAS_PYARROW and isinstance(chunk, pa.RecordBatch):
+            # Arrow批次直接由C++写出，不经过pandas逐行格式化
+            sink = pa.BufferOutputStream()
+            pa_csv.write_csv(chunk, sink, write_options=pa_csv.WriteOptions(
+                include_header=self.first_chunk))
+            self.f.write(sink.getvalue())
+        else:
+            chunk.to_csv(self.f, mode='wb', header=self.first_chunk, 
+                         index=False, encoding='utf-8')
+        self.first_chunk = False
+    
+    def close(self):
+        self.f.close()
+
+class _ExcelOutput(_Output):
+    """
+    Excel输出：使用openpyxl只写模式逐行追加，最后只保存一次
+    
+    避免每个分块都重新打开并重写整个工作簿（O(n²)）
+    """
+    
+    def __init__(self, output_file):
+        import openpyxl
+        self.output_file = output_file
+        self.wb = openpyxl.Workbook(write_only=True)
+        self.ws = self.wb.create_sheet()
+        self.rows = 0
+    
+    def write(self, chunk):
+        # 表头占一行
+        needed = len(chunk) + (0 if self.rows else 1)
+        if self.rows + needed > EXCEL_MAX_ROWS:
+            raise ValueError(f"超过Excel最大行数 {EXCEL_MAX_ROWS:,}，请改用CSV格式输出")
+        
+        if HAS_PYARROW and isinstance(chunk, pa.RecordBatch):
+            columns = chunk.schema.names
+            rows = zip(*(column.to_pylist() for column in chunk.columns))
+        else:
+            columns = list(chunk.columns)
+            # openpyxl不认识NaN/NaT/pd.NA，缺失值统一写成空单元格
+            rows = chunk.astype(object).where(chunk.notna(), None).itertuples(
+                index=False, name=None)
+        
+        if not self.rows:
+            self.ws.append(columns)
+        for row in rows:
+            self.ws.append(row)
+        self.rows += needed
+    
+    def close(self):
+        self.wb.save(self.output_file)
+
+class _ParquetOutput(_Output):
+    """
+    Parquet输出：每个分块写成一个row group，列式压缩（zstd）
+    
+    文件体积通常只有CSV的1/5~1/2，编码也比CSV快；需要安装pyarrow
+    """
+    
+    def __init__(self, output_file):
+        if not HAS_PYARROW:
+            raise ImportError("输出Parquet需要安装pyarrow: pip install pyarrow")
+        import pyarrow.parquet as pq
+        self.pq = pq
+        self.output_file = output_file
+        self.writer = None
+    
+    def write(self, chunk):
+        if isinstance(chunk, pa.RecordBatch):
+            table = pa.Table.from_batches([chunk])
+        else:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+        
+        if self.writer is None:
+            self.writer = self.pq.ParquetWriter(self.output_file, table.schema, 
+                                                compression='zstd')
+        elif table.schema != self.writer.schema:
+            # 后续分块类型推断可能不同（如整列为空），统一转换为第一个分块的类型
+            table = table.cast(self.writer.schema)
+        self.writer.write_table(table)
+    
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+def _open_output(output_file):
+    """根据输出文件扩展名选择写入方式"""
+    if output_file.endswith('.csv'):
+        return _CsvOutput(output_file)
+    if output_file.endswith('.parquet'):
+        return _ParquetOutput(output_file)
+    return _ExcelOutput(output_file)
+
+def _iter_file_chunks(file, chunksize):
+    """按文件类型分块读取，统一产出DataFrame"""
+    ext = os.path.splitext(file)[1]
+    
+    # CSV文件：原生分块读取，顺序读提示由_open_seq处理
+    if ext == '.csv':
+        with _open_seq(file) as f:
+            yield from pd.read_csv(f, chunksize=chunksize, encoding='utf-8-sig', 
+                                   on_bad_lines='skip', low_memory=False)
+        return
+    
+    try:
+        # Stata文件：原生分块读取
+        if ext == '.dta':
+            print(f"    正在分块读取Stata文件...")
+            yield from _iter_stata_chunks(file, chunksize)
+        
+        # Excel文件：流式逐行读取
+        else:
+            print(f"    正在流式读取Excel文件...")
+            yield from _iter_excel_chunks(file, chunksize)
+    finally:
+        # 这两种读取器只接受路径，读完后再释放页缓存
+        _drop_cache(file)
+
+def _merge_serial(files, output_file, chunksize):
+    """逐个文件顺序读取并写入输出文件，返回总行数"""
+    total_rows = 0
+    
+    # 整个合并过程只打开一次输出文件
+    with _open_output(output_file) as out:
+        # 逐个文件处理
+        for idx, file in enumerate(files, 1):
+            print(f"[{idx}/{len(files)}] 处理: {os.path.basename(file)}")
+            # 解析当前文件的同时让内核预读下一个文件
+            if idx < len(files):
+                _prefetch(files[idx])
+            
+            try:
+                # 进度按时间节流输出，避免每批都格式化和打印
+                last_log = time.monotonic()
+                for chunk_num, chunk in enumerate(_iter_file_chunks(file, chunksize), 1):
+                    out.write(chunk)
+                    total_rows += len(chunk)
+                    
+                    now = time.monotonic()
+                    if now - last_log > PROGRESS_INTERVAL:
+                        print(f"    已处理 {chunk_num} 批，累计 {total_rows:,} 行")
+                        last_log = now
+                
+                print(f"  ✓ 完成，累计总行数: {total_rows:,}\n")
+                
+            except Exception as e:
+                print(f"  ❌ 处理失败: {str(e)}\n")
+                continue
+    
+    return total_rows
+
+def _convert_to_csv_part(file, part_file, chunksize):
+    """子进程：把单个输入文件转换为带表头、无BOM的临时CSV分片，返回行数"""
+    rows = 0
+    with _CsvOutput(part_file, bom=False) as out:
+        for chunk in _iter_file_chunks(file, chunksize):
+            out.write(chunk)
+            rows += len(chunk)
+    return rows
+
+def _merge_csv_parallel(files, output_file, chunksize, max_workers):
+    """
+    多进程并行把输入文件转换为临时CSV分片，主进程按输入顺序拼接到输出文件
+    
+    读取/解析后面的文件时同时写出前面的文件；同时最多保留 max_workers*2 个
+    分片，避免临时文件占满磁盘。返回总行数
+    """
+    part_dir = os.path.dirname(os.path.abspath(output_file))
+    pending = collections.deque()
+    remaining = iter(enumerate(files, 1))
+    total_rows = 0
+    first_part = True
+    
+    def submit_next(executor):
+        item = next(remaining, None)
+        if item is None:
+            return
+        idx, file = item
+        fd, part_file = tempfile.mkstemp(suffix='.part.csv', dir=part_dir)
+        os.close(fd)
+        future = executor.submit(_convert_to_csv_part, file, part_file, chunksize)
+        pending.append((idx, file, part_file, future))
+    
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor, \
+             open(output_file, 'wb', buffering=COPY_BUFSIZE) as out:
+            out.write(codecs.BOM_UTF8)
+            for _ in range(max_workers * 2):
+                submit_next(executor)
+            
+            # 只有主进程写输出文件，按输入顺序拼接
+            while pending:
+                idx, file, part_file, future = pending.popleft()
+                submit_next(executor)
+                print(f"[{idx}/{len(files)}] 处理: {os.path.basename(file)}")
+                
+                try:
+                    rows = future.result()
+                    with open(part_file, 'rb') as src:
+                        # 第一个非空分片保留表头，其余跳过表头行
+                        if not first_part:
+                            src.readline()
+                        elif os.path.getsize(part_file) > 0:
+                            first_part = False
+                        shutil.copyfileobj(src, out, COPY_BUFSIZE)
+                    total_rows += rows
+                    print(f"  ✓ 完成，累计总行数: {total_rows:,}\n")
+                except Exception as e:
+                    print(f"  ❌ 处理失败: {str(e)}\n")
+                finally:
+                    os.remove(part_file)
+    finally:
+        # 中途退出时清理尚未拼接的分片
+        for _, _, part_file, _ in pending:
+            if os.path.exists(part_file):
+                os.remove(part_file)
+    
+    return total_rows
+
+def merge_large_files(input_dir="test_data", output_file="merged.csv", chunksize=10000,
+                      max_workers=None):
     """
     使用分块处理合并大文件，内存友好
     
     参数:
         input_dir: 输入目录
-        output_file: 输出文件（建议使用.csv格式，更快）
+        output_file: 输出文件，按扩展名选择格式：.csv / .parquet / .xlsx
+                     （.parquet体积最小、写入最快，需安装pyarrow）
         chunksize: 每次处理的行数（根据内存调整，默认10000行）
+        max_workers: 并行处理的进程数（默认 min(4, CPU核数)，设为1则顺序处理）
     
     注意：
-        - 大文件建议输出为CSV格式（比Excel快很多）
+        - 大文件建议输出为Parquet（后续用Python/R分析）或CSV格式，都比Excel快很多
+        - 并行时内存占用约为单进程的 max_workers 倍，内存紧张时调小
         - 如果必须用Excel，文件不能超过1,048,576行
     """
     
     # 查找所有文件
-    files = glob.glob(os.path.join(input_dir, "*.xlsx")) + \
-            glob.glob(os.path.join(input_dir, "*.xls")) + \
-            glob.glob(os.path.join(input_dir, "*.csv")) + \
-            glob.glob(os.path.join(input_dir, "*.dta"))
-    
-    files.sort()
+    files = _list_files(input_dir, tuple(FILE_TYPES))
     
     if len(files) == 0:
         print(f"❌ 在 {input_dir} 中没有找到文件")
@@ -47,12 +459,7 @@ def merge_large_files(input_dir="test_data", output_file="merged.csv", chunksize
     # 统计文件类型
     file_types = {'Excel': 0, 'CSV': 0, 'Stata': 0}
     for f in files:
-        if f.endswith('.dta'):
-            file_types['Stata'] += 1
-        elif f.endswith('.csv'):
-            file_types['CSV'] += 1
-        else:
-            file_types['Excel'] += 1
+        file_types[FILE_TYPES[os.path.splitext(f)[1]]] += 1
     
     print(f"找到 {len(files)} 个文件")
     if file_types['Stata'] > 0:
@@ -64,125 +471,15 @@ def merge_large_files(input_dir="test_data", output_file="merged.csv", chunksize
     print(f"使用分块处理，每批 {chunksize} 行")
     print(f"输出文件: {output_file}\n")
     
-    total_rows = 0
-    first_chunk = True
+    if max_workers is None:
+        max_workers = min(4, os.cpu_count() or 1)
     
-    # 逐个文件处理
-    for idx, file in enumerate(files, 1):
-        print(f"[{idx}/{len(files)}] 处理: {os.path.basename(file)}")
-        
-        try:
-            # Stata文件：分块读取
-            if file.endswith('.dta'):
-                print(f"    正在读取Stata文件...")
-                
-                # 读取Stata文件
-                if HAS_PYREADSTAT:
-                    # 使用pyreadstat（更快，支持更多特性）
-                    df, meta = pyreadstat.read_dta(file)
-                else:
-                    # 使用pandas（基础支持）
-                    df = pd.read_stata(file)
-                
-                file_rows = len(df)
-                print(f"    文件包含 {file_rows:,} 行，开始分块写入...")
-                
-                # 分块处理
-                for start in range(0, file_rows, chunksize):
-                    end = min(start + chunksize, file_rows)
-                    chunk = df.iloc[start:end]
-                    
-                    mode = 'w' if first_chunk else 'a'
-                    header = first_chunk
-                    
-                    if output_file.endswith('.csv'):
-                        chunk.to_csv(output_file, mode=mode, header=header, 
-                                   index=False, encoding='utf-8-sig')
-                    else:
-                        if first_chunk:
-                            chunk.to_excel(output_file, index=False)
-                        else:
-                            with pd.ExcelWriter(output_file, mode='a', engine='openpyxl', 
-                                              if_sheet_exists='overlay') as writer:
-                                chunk.to_excel(writer, index=False, header=False, 
-                                             startrow=total_rows)
-                    
-                    first_chunk = False
-                    total_rows += len(chunk)
-                    
-                    if (end - start) > 0 and end % (chunksize * 10) == 0:
-                        print(f"    已处理 {end:,}/{file_rows:,} 行")
-            
-            # CSV文件：分块读取
-            elif file.endswith('.csv'):
-                reader = pd.read_csv(file, chunksize=chunksize, encoding='utf-8-sig', 
-                                    on_bad_lines='skip', low_memory=False)
-                
-                for chunk_num, chunk in enumerate(reader, 1):
-                    # 第一次写入时创建文件（包含表头）
-                    # 后续追加时不写表头
-                    mode = 'w' if first_chunk else 'a'
-                    header = first_chunk
-                    
-                    if output_file.endswith('.csv'):
-                        chunk.to_csv(output_file, mode=mode, header=header, 
-                                   index=False, encoding='utf-8-sig')
-                    else:
-                        # Excel格式需要特殊处理（不推荐大文件用Excel）
-                        if first_chunk:
-                            chunk.to_excel(output_file, index=False)
-                        else:
-                            with pd.ExcelWriter(output_file, mode='a', engine='openpyxl') as writer:
-                                chunk.to_excel(writer, index=False, header=False)
-                    
-                    first_chunk = False
-                    total_rows += len(chunk)
-                    
-                    if chunk_num % 10 == 0:
-                        print(f"    已处理 {chunk_num} 批，累计 {total_rows:,} 行")
-            
-            # Excel文件：分块读取（需要先转换）
-            else:
-                # Excel不支持原生分块读取，需要分批处理
-                print(f"    正在读取Excel文件...")
-                
-                # 对于超大Excel文件，使用 iter_rows 或分批读取
-                df = pd.read_excel(file, engine='openpyxl')
-                file_rows = len(df)
-                print(f"    文件包含 {file_rows:,} 行，开始分块写入...")
-                
-                # 分块处理
-                for start in range(0, file_rows, chunksize):
-                    end = min(start + chunksize, file_rows)
-                    chunk = df.iloc[start:end]
-                    
-                    mode = 'w' if first_chunk else 'a'
-                    header = first_chunk
-                    
-                    if output_file.endswith('.csv'):
-                        chunk.to_csv(output_file, mode=mode, header=header, 
-                                   index=False, encoding='utf-8-sig')
-                    else:
-                        if first_chunk:
-                            chunk.to_excel(output_file, index=False)
-                        else:
-                            # Excel追加写入（有行数限制）
-                            with pd.ExcelWriter(output_file, mode='a', engine='openpyxl', 
-                                              if_sheet_exists='overlay') as writer:
-                                chunk.to_excel(writer, index=False, header=False, 
-                                             startrow=total_rows)
-                    
-                    first_chunk = False
-                    total_rows += len(chunk)
-                    
-                    if (end - start) > 0 and end % (chunksize * 10) == 0:
-                        print(f"    已处理 {end:,}/{file_rows:,} 行")
-                
-            print(f"  ✓ 完成，累计总行数: {total_rows:,}\n")
-            
-        except Exception as e:
-            print(f"  ❌ 处理失败: {str(e)}\n")
-            continue
+    # 并行只用于CSV输出；Excel工作簿只能在一个进程里顺序写
+    if output_file.endswith('.csv') and max_workers > 1 and len(files) > 1:
+        print(f"并行处理: {max_workers} 个进程\n")
+        total_rows = _merge_csv_parallel(files, output_file, chunksize, max_workers)
+    else:
+        total_rows = _merge_serial(files, output_file, chunksize)
     
     print(f"{'='*60}")
     print(f"✅ 合并完成！")
@@ -201,8 +498,7 @@ def quick_merge_stata_only(input_dir="test_data", output_file="merged.csv", chun
     2. 使用更大的chunk size
     3. 自动处理Stata格式特性
     """
-    files = glob.glob(os.path.join(input_dir, "*.dta"))
-    files.sort()
+    files = _list_files(input_dir, '.dta')
     
     if len(files) == 0:
         print(f"❌ 在 {input_dir} 中没有找到Stata文件")
@@ -212,79 +508,240 @@ def quick_merge_stata_only(input_dir="test_data", output_file="merged.csv", chun
     print(f"快速合并模式 (chunk size: {chunksize})\n")
     
     total_rows = 0
-    first_file = True
     
-    for idx, file in enumerate(files, 1):
-        print(f"[{idx}/{len(files)}] {os.path.basename(file)}", end=" ... ")
-        
-        try:
-            # 读取Stata文件
-            if HAS_PYREADSTAT:
-                df, meta = pyreadstat.read_dta(file)
-            else:
-                df = pd.read_stata(file)
-            
-            file_rows = len(df)
+    # 输出文件只打开一次；Excel输出使用只写工作簿，最后保存一次
+    with _open_output(output_file) as out:
+        for idx, file in enumerate(files, 1):
+            print(f"[{idx}/{len(files)}] {os.path.basename(file)}", end=" ... ")
             
-            # 分块处理
-            for start in range(0, file_rows, chunksize):
-                end = min(start + chunksize, file_rows)
-                chunk = df.iloc[start:end]
-                
-                if output_file.endswith('.csv'):
-                    chunk.to_csv(output_file, mode='w' if first_file else 'a', 
-                                header=first_file, index=False, encoding='utf-8-sig')
-                else:
-                    if first_file:
-                        chunk.to_excel(output_file, index=False)
-                    else:
-                        with pd.ExcelWriter(output_file, mode='a', engine='openpyxl', 
-                                          if_sheet_exists='overlay') as writer:
-                            chunk.to_excel(writer, index=False, header=False, 
-                                         startrow=total_rows)
+            try:
+                # 分块读取Stata文件
+                for chunk in _iter_stata_chunks(file, chunksize):
+                    out.write(chunk)
+                    total_rows += len(chunk)
                 
-                first_file = False
-                total_rows += len(chunk)
-            
-            print(f"✓ 累计 {total_rows:,} 行")
-        except Exception as e:
-            print(f"❌ 处理失败: {str(e)}")
-            continue
+                print(f"✓ 累计 {total_rows:,} 行")
+            except Exception as e:
+                print(f"❌ 处理失败: {str(e)}")
+                continue
     
     print(f"\n✅ 完成！共 {total_rows:,} 行，保存到: {output_file}")
 
-def quick_merge_csv_only(input_dir="test_data", output_file="merged.csv", chunksize=50000):
+def _read_header(path):
+    """读取文件第一行，返回 (第一行原始字节长度, 去掉BOM和换行符的表头)"""
+    with open(path, 'rb') as f:
+        first_line = f.readline()
+    return len(first_line), first_line.lstrip(codecs.BOM_UTF8).rstrip(b'\r\n')
+
+def _parse_header(header):
+    """把表头行（bytes）解析成列名列表"""
+    return next(csv.reader([header.decode('utf-8')]), [])
+
+def _unify_headers(headers):
+    """
+    合并所有文件的表头，返回 (列名列表, 输出表头bytes)
+    
+    列按首次出现的顺序取并集；与第一个文件一致时原样使用其表头
+    """
+    columns = []
+    seen = set()
+    first_header = None
+    for _, header in headers:
+        if not header:
+            continue
+        if first_header is None:
+            first_header = header
+        for column in _parse_header(header):
+            if column not in seen:
+                seen.add(column)
+                columns.append(column)
+    
+    if first_header is not None and _parse_header(first_header) == columns:
+        return columns, first_header
+    
+    buf = io.StringIO()
+    csv.writer(buf, lineterminator='').writerow(columns)
+    return columns, buf.getvalue().encode('utf-8')
+
+def _append_csv_reordered(file, dst, columns):
+    """
+    用pyarrow读取列不一致的CSV，按columns顺序重排后追加到dst（不写表头）
+    
+    所有列按字符串读取，保证数值原样输出；文件中缺少的列输出为空；
+    返回写入的行数
+    """
+    with _open_seq(file) as src:
+        reader = pa_csv.open_csv(
+            src,
+            read_options=pa_csv.ReadOptions(block_size=64 << 20, use_threads=True),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={c: pa.string() for c in columns},
+                strings_can_be_null=False,
+            ),
+        )
+        write_options = pa_csv.WriteOptions(include_header=False)
+        
+        present = set(reader.schema.names)
+        
+        rows = 0
+        for batch in reader:
+            arrays = [batch.column(batch.schema.get_field_index(c)) if c in present
+                      else pa.nulls(batch.num_rows, pa.string()) for c in columns]
+            table = pa.Table.from_arrays(arrays, names=columns)
+            sink = pa.BufferOutputStream()
+            pa_csv.write_csv(table, sink, write_options=write_options)
+            dst.write(sink.getvalue())
+            rows += batch.num_rows
+    return rows
+
+def _copy_file_tail(src, dst, offset):
+    """
+    把src从offset开始的全部内容追加到dst，返回src的文件大小
+    
+    优先使用os.copy_file_range、其次os.sendfile在内核中完成拷贝，数据不经过用户空间；
+    都不支持或失败（如跨文件系统）时从已拷贝位置继续用普通缓冲拷贝
+    """
+    dst.flush()
+    src_fd = src.fileno()
+    dst_fd = dst.fileno()
+    size = os.fstat(src_fd).st_size
+    
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while offset < size:
+                copied = os.copy_file_range(src_fd, dst_fd, size - offset, offset)
+                if copied == 0:
+                    break
+                offset += copied
+        except OSError:
+            pass
+    
+    if offset < size and hasattr(os, 'sendfile'):
+        try:
+            while offset < size:
+                copied = os.sendfile(dst_fd, src_fd, offset, size - offset)
+                if copied == 0:
+                    break
+                offset += copied
+        except OSError:
+            pass
+    
+    if offset < size:
+        src.seek(offset)
+        shutil.copyfileobj(src, dst, COPY_BUFSIZE)
+    return size
+
+def _count_newlines(src, offset, size):
+    """
+    统计src从offset到size的换行符个数
+    
+    通过mmap直接在页缓存上计数，不经过read()拷贝到Python缓冲区
+    """
+    if size <= offset:
+        return 0
+    with mmap.mmap(src.fileno(), size, access=mmap.ACCESS_READ) as mm:
+        if hasattr(mm, 'count'):
+            # Python 3.13+
+            return mm.count(b'\n', offset, size)
+        count = 0
+        for pos in range(offset, size, COPY_BUFSIZE):
+            count += mm[pos:min(pos + COPY_BUFSIZE, size)].count(b'\n')
+        return count
+
+def _last_byte(src, offset, size):
+    """只读取src的最后一个字节（数据部分为空时返回b''）"""
+    if size <= offset:
+        return b''
+    if hasattr(os, 'pread'):
+        return os.pread(src.fileno(), 1, size - 1)
+    src.seek(size - 1)
+    return src.read(1)
+
+def quick_merge_csv_only(input_dir="test_data", output_file="merged.csv", chunksize=50000,
+                         count_rows=True):
     """
     仅合并CSV文件的极速版本（推荐用于超大数据）
     
     这是最快的方式：
     1. 只处理CSV文件
-    2. 使用更大的chunk size
-    3. 直接追加，不做任何转换
+    2. 先并行读取所有文件的表头，输出列为所有文件列的并集（未安装pyarrow时
+       以第一个文件的表头为准）
+    3. 与输出列一致的文件按字节直接拷贝（跳过表头行），Linux下在内核中完成，
+       不经过pandas解析/格式化，也不经过Python读写
+    4. 列不一致的文件用pyarrow按输出列重新对齐，缺少的列留空（需安装pyarrow）
+    
+    参数:
+        chunksize: 保留参数（兼容旧调用），字节拷贝不再按行分块
+        count_rows: 是否统计行数；直接拷贝的文件需通过mmap再扫描一遍才能计数，
+                    设为False时只拷贝不计数，进度按已写入的字节数显示
     """
-    files = glob.glob(os.path.join(input_dir, "*.csv"))
-    files.sort()
+    files = _list_files(input_dir, '.csv')
     
     print(f"找到 {len(files)} 个CSV文件")
-    print(f"快速合并模式 (chunk size: {chunksize})\n")
+    print(f"快速合并模式 (字节拷贝)\n")
+    
+    # 每个文件只读第一行，并行完成
+    with ThreadPoolExecutor(max_workers=min(16, len(files) or 1)) as executor:
+        headers = list(executor.map(_read_header, files))
+    
+    if HAS_PYARROW:
+        columns, header = _unify_headers(headers)
+    else:
+        # 没有pyarrow无法重新对齐，以第一个非空文件的表头为准
+        header = next((h for _, h in headers if h), b'')
+        columns = _parse_header(header)
+    
+    def _progress(rows, dst):
+        """进度说明：计数时显示累计行数，否则显示输出文件大小"""
+        if count_rows:
+            return f"累计 {rows:,} 行"
+        # 内核拷贝绕过了dst的缓冲区，按文件实际大小统计
+        dst.flush()
+        return f"已写入 {os.fstat(dst.fileno()).st_size / 1024**2:,.1f} MB"
     
     total_rows = 0
-    first_file = True
     
-    for idx, file in enumerate(files, 1):
-        print(f"[{idx}/{len(files)}] {os.path.basename(file)}", end=" ... ")
+    with open(output_file, 'wb') as dst:
+        dst.write(codecs.BOM_UTF8)
+        dst.write(header + b'\n')
         
-        # 分块读取并追加
-        for chunk in pd.read_csv(file, chunksize=chunksize, encoding='utf-8-sig', 
-                                low_memory=False):
-            chunk.to_csv(output_file, mode='w' if first_file else 'a', 
-                        header=first_file, index=False, encoding='utf-8-sig')
-            first_file = False
-            total_rows += len(chunk)
-        
-        print(f"✓ 累计 {total_rows:,} 行")
+        for idx, (file, (offset, file_header)) in enumerate(zip(files, headers), 1):
+            print(f"[{idx}/{len(files)}] {os.path.basename(file)}", end=" ... ")
+            if idx < len(files):
+                _prefetch(files[idx])
+            
+            if not file_header:
+                print(f"❌ 空文件，已跳过")
+                continue
+            
+            # 表头已去掉BOM和换行符，兼容有/无BOM、CRLF/LF混用；
+            # 列与输出一致的文件走内核拷贝的快速路径，其余文件按列重新对齐
+            same_columns = file_header == header or _parse_header(file_header) == columns
+            if not same_columns:
+                if HAS_PYARROW:
+                    total_rows += _append_csv_reordered(file, dst, columns)
+                    print(f"✓ 已按列名重新对齐，{_progress(total_rows, dst)}")
+                else:
+                    print(f"❌ 表头与第一个文件不一致（安装pyarrow可自动对齐），已跳过")
+                continue
+            
+            with _open_seq(file) as src:
+                # 拷贝数据行（Linux下在内核中完成），需要时再用mmap按换行符计数
+                size = _copy_file_tail(src, dst, offset)
+                if count_rows:
+                    total_rows += _count_newlines(src, offset, size)
+                
+                # 文件末尾没有换行符时补上，避免和下一个文件的首行粘连
+                if _last_byte(src, offset, size) not in (b'', b'\n'):
+                    dst.write(b'\n')
+                    total_rows += 1
+            
+            print(f"✓ {_progress(total_rows, dst)}")
     
-    print(f"\n✅ 完成！共 {total_rows:,} 行，保存到: {output_file}")
+    if count_rows:
+        print(f"\n✅ 完成！共 {total_rows:,} 行，保存到: {output_file}")
+    else:
+        print(f"\n✅ 完成！保存到: {output_file}")
 
 if __name__ == "__main__":
     # 方式1：标准方式（支持Excel和CSV混合）
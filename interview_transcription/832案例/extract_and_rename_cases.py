@@ -14,13 +14,134 @@
     python extract_and_rename_cases.py --dry-run  # 预览模式，不实际复制文件
 """
 
+import errno
+import os
 import re
 import shutil
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from functools import lru_cache
+from itertools import islice
+from operator import attrgetter
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-from docx import Document
+from typing import Dict, Iterator, List, Optional, Tuple
 import json
 
+# 优先使用 orjson 写JSON报告（C实现，带缩进输出也很快）
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+# 预编译的县名匹配模式
+# 文件名：省?市?县，如"江西省万安县"
+_PAT_FILENAME = re.compile(r'([\u4e00-\u9fa5]+省)?([\u4e00-\u9fa5]+市)?([\u4e00-\u9fa5]+(县|市|区|旗|自治县|自治旗))')
+# 正文中的干扰词
+_NOISE_RE = re.compile("访谈团抵达|访谈团来到|传承队来到|调研团抵达")
+# 下列各正文模式的公共部分：至少2个汉字紧跟县/市/区/旗（自治县、自治旗同样满足）
+_PAT_COUNTY_HINT = re.compile(r'[\u4e00-\u9fa5]{2}(?:县|市|区|旗)')
+# 正文模式1: 省+县
+_PAT_PROV_COUNTY = re.compile(r'([\u4e00-\u9fa5]+省)([\u4e00-\u9fa5]{2,}(县|自治县|市|区|旗|自治旗))')
+# 正文模式2: 省+市+县
+_PAT_PROV_CITY_COUNTY = re.compile(r'([\u4e00-\u9fa5]+省)([\u4e00-\u9fa5]+市)([\u4e00-\u9fa5]{2,}(县|自治县|市|区|旗|自治旗))')
+# 正文模式3: 市+县
+_PAT_CITY_COUNTY = re.compile(r'([\u4e00-\u9fa5]+市)([\u4e00-\u9fa5]{2,}(县|自治县|市|区|旗|自治旗))')
+# 正文模式4: 只有县名（至少2个字）
+_PAT_COUNTY_ONLY = re.compile(r'([\u4e00-\u9fa5]{2,}(县|自治县|区|旗|自治旗))')
+
+# 非县名的词（合成一个正则，一次扫描完成多个关键词的判断）
+_EXCLUDE_WORDS = ("农业大", "工业大", "经济", "发展")
+_EXCLUDE_WORDS_COUNTY_ONLY = _EXCLUDE_WORDS + ("上限", "下限", "突破", "传统", "现代")
+_EXCLUDE_WORDS_RE = re.compile('|'.join(map(re.escape, _EXCLUDE_WORDS)))
+_EXCLUDE_WORDS_COUNTY_ONLY_RE = re.compile('|'.join(map(re.escape, _EXCLUDE_WORDS_COUNTY_ONLY)))
+
+
+# docx 正文（word/document.xml）中用到的元素
+_W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_W_BODY = _W_NS + 'body'
+_W_P = _W_NS + 'p'
+_W_R = _W_NS + 'r'
+_W_HYPERLINK = _W_NS + 'hyperlink'
+_W_T = _W_NS + 't'
+_RUN_SPECIAL_TEXT = {_W_NS + 'tab': '\t', _W_NS + 'br': '\n', _W_NS + 'cr': '\n'}
+
+
+def _run_text(run) -> str:
+    return ''.join(
+        (child.text or '') if child.tag == _W_T else _RUN_SPECIAL_TEXT.get(child.tag, '')
+        for child in run
+    )
+
+
+def _paragraph_text(p) -> str:
+    """段落文字：与 python-docx 的 Paragraph.text 一致，取段落下（含超链接内）各 run 的文字"""
+    parts = []
+    for child in p:
+        if child.tag == _W_R:
+            parts.append(_run_text(child))
+        elif child.tag == _W_HYPERLINK:
+            parts.extend(_run_text(run) for run in child if run.tag == _W_R)
+    return ''.join(parts)
+
+
+def _iter_docx_paragraphs(doc_path: Path) -> Iterator[str]:
+    """
+    流式逐段读取 docx 正文的段落文字
+    
+    与 python-docx 的 doc.paragraphs 相同，只取正文直属段落（不含表格内段落）；
+    按需解析，调用方停止迭代即停止读取，已处理的元素随即释放，不构建整篇文档。
+    只用标准库（zipfile + ElementTree），无需加载 python-docx。
+    """
+    body = None
+    depth = 0
+    with zipfile.ZipFile(doc_path) as zf, zf.open('word/document.xml') as f:
+        for event, elem in ET.iterparse(f, events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                if elem.tag == _W_BODY:
+                    body = elem
+                continue
+            
+            depth -= 1
+            # 只处理 w:document > w:body 的直属元素
+            if depth != 2 or body is None:
+                continue
+            if elem.tag == _W_P:
+                yield _paragraph_text(elem)
+            # 释放已处理的正文元素（段落、表格等）
+            body.clear()
+
+
+# 无法创建硬链接时（跨文件系统、文件系统不支持等）退回复制
+_LINK_FALLBACK_ERRNOS = (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.EOPNOTSUPP)
+
+
+def _link_or_copy(src: Path, dst: Path) -> bool:
+    """尝试为 src 创建硬链接 dst，成功返回 True；不支持硬链接时返回 False，由调用方复制"""
+    try:
+        os.link(src, dst)
+        return True
+    except OSError as e:
+        if e.errno in _LINK_FALLBACK_ERRNOS:
+            return False
+        raise
+
+
+def _list_docs(year_path: Path) -> List[os.DirEntry]:
+    """单次 scandir 列出目录下的 .docx/.doc 文件，按文件名排序"""
+    with os.scandir(year_path) as it:
+        # is_file(follow_symlinks=False) 直接使用 scandir 返回的类型信息，不再额外 stat
+        entries = [
+            entry for entry in it
+            if entry.is_file(follow_symlinks=False) and entry.name.lower().endswith(('.docx', '.doc'))
+        ]
+    entries.sort(key=attrgetter('name'))
+    return entries
+
 
 class CountyNameExtractor:
     """县名提取器"""
@@ -33,6 +154,7 @@ class CountyNameExtractor:
     
     # 需要排除的关键词
     EXCLUDE_KEYWORDS = ["大推送", "大报告", "汇报"]
+    _EXCLUDE_RE = re.compile('|'.join(map(re.escape, EXCLUDE_KEYWORDS)))
     
     def __init__(self, base_dir: Path):
         self.base_dir = base_dir
@@ -40,16 +162,15 @@ class CountyNameExtractor:
         
     def should_exclude_file(self, filename: str) -> bool:
         """判断文件是否应该排除"""
-        return any(keyword in filename for keyword in self.EXCLUDE_KEYWORDS)
+        return self._EXCLUDE_RE.search(filename) is not None
     
     def extract_county_from_filename(self, filename: str) -> Optional[str]:
         """从文件名中提取县名"""
         # 移除文件扩展名
-        name = filename.replace('.docx', '').replace('.doc', '')
+        name = os.path.splitext(filename)[0]
         
         # 尝试匹配完整的省市县格式：如"江西省万安县"
-        pattern = r'([\u4e00-\u9fa5]+省)?([\u4e00-\u9fa5]+市)?([\u4e00-\u9fa5]+(县|市|区|旗|自治县|自治旗))'
-        match = re.search(pattern, name)
+        match = _PAT_FILENAME.search(name)
         if match:
             # 返回完整的省市县名称（如果有）
             province = match.group(1) or ""
@@ -70,84 +191,97 @@ class CountyNameExtractor:
     def extract_county_from_content(self, doc_path: Path) -> Optional[str]:
         """从文档内容中提取县名"""
         try:
-            doc = Document(doc_path)
-            
-            # 策略1：从标题提取（前3段）
-            for i, para in enumerate(doc.paragraphs[:3]):
-                text = para.text.strip()
-                if not text:
-                    continue
-                    
-                # 查找县名模式
-                county = self._find_county_in_text(text)
-                if county:
-                    return county
-            
-            # 策略2：从"访谈团抵达XX县"提取（前20段）
-            for para in doc.paragraphs[:20]:
-                text = para.text.strip()
-                if "访谈团" in text and ("抵达" in text or "来到" in text):
-                    county = self._find_county_in_text(text)
-                    if county:
-                        return county
-            
-            # 策略3：从正文开头提取（前30段）
-            for para in doc.paragraphs[:30]:
-                text = para.text.strip()
-                if len(text) > 20:  # 只检查较长的段落
-                    county = self._find_county_in_text(text)
-                    if county:
-                        return county
-                        
+            with closing(_iter_docx_paragraphs(doc_path)) as paragraphs:
+                return self._find_county_in_paragraphs(paragraphs)
         except Exception as e:
             print(f"  ⚠️  读取文档失败: {e}")
             return None
+    
+    def _find_county_in_paragraphs(self, paragraphs: Iterator[str]) -> Optional[str]:
+        """按优先级策略在文档开头的段落中查找县名；段落按需读取，每段只 strip 一次"""
+        # 策略1：从标题提取（前3段）——多数文档在此命中，无需再解析后面的段落
+        paras = [text.strip() for text in islice(paragraphs, 3)]
+        for text in paras:
+            if not text:
+                continue
+                
+            # 查找县名模式
+            county = self._find_county_in_text(text)
+            if county:
+                return county
+        
+        # 后续策略最多查看前30段
+        paras.extend(text.strip() for text in islice(paragraphs, 27))
+        
+        # 先对第4~30段整体做一次县名形态扫描：都不含县名时无需逐段查找
+        if not _PAT_COUNTY_HINT.search(_NOISE_RE.sub("", "\n".join(paras[3:]))):
+            return None
+        
+        # 前3段的非空段落已在策略1中查过，后续策略不再重复查找
+        scanned = set()
+        
+        # 策略2：从"访谈团抵达XX县"提取（前20段）
+        for i in range(3, min(20, len(paras))):
+            text = paras[i]
+            if "访谈团" in text and ("抵达" in text or "来到" in text):
+                scanned.add(i)
+                county = self._find_county_in_text(text)
+                if county:
+                    return county
+        
+        # 策略3：从正文开头提取（前30段）
+        for i in range(3, len(paras)):
+            text = paras[i]
+            if len(text) > 20 and i not in scanned:  # 只检查较长的段落
+                county = self._find_county_in_text(text)
+                if county:
+                    return county
         
         return None
     
-    def _find_county_in_text(self, text: str) -> Optional[str]:
-        """在文本中查找县名"""
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _find_county_in_text(text: str) -> Optional[str]:
+        """在文本中查找县名（按段落文字缓存，不同文档常有相同的模板段落）"""
         # 先移除一些干扰词
-        text = text.replace("访谈团抵达", "").replace("访谈团来到", "")
-        text = text.replace("传承队来到", "").replace("调研团抵达", "")
+        text = _NOISE_RE.sub("", text)
+        
+        # 一次扫描排除不含县名形态的段落，避免依次跑完下面四个模式
+        if not _PAT_COUNTY_HINT.search(text):
+            return None
         
         # 模式1: 省+市+县（最完整，不包含市）
-        pattern1 = r'([\u4e00-\u9fa5]+省)([\u4e00-\u9fa5]{2,}(县|自治县|市|区|旗|自治旗))'
-        match = re.search(pattern1, text)
+        match = _PAT_PROV_COUNTY.search(text)
         if match:
             province = match.group(1)
             county = match.group(2)
             # 排除一些非县名的词
-            if not any(word in county for word in ["农业大", "工业大", "经济", "发展"]):
+            if not _EXCLUDE_WORDS_RE.search(county):
                 return f"{province}{county}"
         
         # 模式2: 省+市+县（完整三级）
-        pattern2 = r'([\u4e00-\u9fa5]+省)([\u4e00-\u9fa5]+市)([\u4e00-\u9fa5]{2,}(县|自治县|市|区|旗|自治旗))'
-        match = re.search(pattern2, text)
+        match = _PAT_PROV_CITY_COUNTY.search(text)
         if match:
             province = match.group(1)
             county = match.group(3)
-            if not any(word in county for word in ["农业大", "工业大", "经济", "发展"]):
+            if not _EXCLUDE_WORDS_RE.search(county):
                 return f"{province}{county}"
         
         # 模式3: 市+县
-        pattern3 = r'([\u4e00-\u9fa5]+市)([\u4e00-\u9fa5]{2,}(县|自治县|市|区|旗|自治旗))'
-        match = re.search(pattern3, text)
+        match = _PAT_CITY_COUNTY.search(text)
         if match:
             city = match.group(1)
             county = match.group(2)
             # 避免"市市"、"市县"等重复
-            if city != county and not any(word in county for word in ["农业大", "工业大", "经济", "发展"]):
+            if city != county and not _EXCLUDE_WORDS_RE.search(county):
                 return f"{city}{county}"
         
         # 模式4: 只有县名（至少2个字）
-        pattern4 = r'([\u4e00-\u9fa5]{2,}(县|自治县|区|旗|自治旗))'
-        match = re.search(pattern4, text)
+        match = _PAT_COUNTY_ONLY.search(text)
         if match:
             county = match.group(1)
             # 排除一些明显不是县名的词
-            exclude_words = ["农业大", "工业大", "经济", "发展", "上限", "下限", "突破", "传统", "现代"]
-            if not any(word in county for word in exclude_words):
+            if not _EXCLUDE_WORDS_COUNTY_ONLY_RE.search(county):
                 return county
         
         return None
@@ -172,13 +306,51 @@ class CountyNameExtractor:
         
         return None, "未提取"
     
-    def process_all_files(self, output_dir: Path, dry_run: bool = False) -> Dict:
+    def extract_all(self, file_paths: List[str], max_workers: Optional[int] = None) -> List[Tuple[Optional[str], str]]:
+        """
+        用多进程并行提取县名（解析docx是CPU密集型，各文件互不相关）
+        
+        文件名中能提取到县名的在主进程中直接处理，只有需要读取文档内容的文件
+        才交给子进程；没有这样的文件时不启动进程池。
+        
+        返回: 与 file_paths 顺序一致的 (县名, 提取方式) 列表
+        """
+        extracted = [None] * len(file_paths)
+        pending = []
+        for i, file_path in enumerate(file_paths):
+            county = self.extract_county_from_filename(os.path.basename(file_path))
+            if county:
+                extracted[i] = (county, "文件名")
+            else:
+                pending.append(i)
+        
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        pending_paths = [file_paths[i] for i in pending]
+        if max_workers <= 1 or len(pending_paths) <= 1:
+            from_content = [self.extract_county_name(Path(p)) for p in pending_paths]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_init_worker,
+                initargs=(self.base_dir,)
+            ) as executor:
+                from_content = list(executor.map(_extract_worker, pending_paths, chunksize=4))
+        
+        for i, result in zip(pending, from_content):
+            extracted[i] = result
+        return extracted
+    
+    def process_all_files(self, output_dir: Path, dry_run: bool = False,
+                          max_workers: Optional[int] = None, link: bool = False) -> Dict:
         """
         处理所有文件
         
         参数:
             output_dir: 输出目录（案例补充文件夹）
             dry_run: 是否为预览模式（不实际复制文件）
+            max_workers: 并行提取县名的进程数（默认: CPU核数）
+            link: 是否用硬链接代替复制（同一文件系统上不复制数据）
         
         返回:
             处理报告字典
@@ -191,15 +363,30 @@ class CountyNameExtractor:
             "details": []
         }
         
-        # 创建输出目录
+        # 创建输出目录，并记下其中已有的文件名（用于处理重名）
+        existing = set()
         if not dry_run:
             output_dir.mkdir(parents=True, exist_ok=True)
+            existing = set(os.listdir(output_dir))
         
-        # 遍历年份文件夹
+        # 先列出所有年份文件夹的文件，None 表示文件夹不存在
+        year_files = []
         for year_folder in self.year_folders:
             year_path = self.base_dir / year_folder
-            
-            if not year_path.exists():
+            year_files.append((year_folder, _list_docs(year_path) if year_path.exists() else None))
+        
+        # 并行提取县名；复制文件是I/O操作，仍在主进程中按顺序进行
+        to_extract = [
+            entry.path
+            for _, entries in year_files if entries
+            for entry in entries if not self.should_exclude_file(entry.name)
+        ]
+        print(f"🔎 提取县名: {len(to_extract)} 个文件")
+        extracted = dict(zip(to_extract, self.extract_all(to_extract, max_workers)))
+        
+        # 遍历年份文件夹
+        for year_folder, entries in year_files:
+            if entries is None:
                 print(f"⚠️  文件夹不存在: {year_folder}")
                 continue
             
@@ -207,13 +394,9 @@ class CountyNameExtractor:
             print(f"📂 处理: {year_folder}")
             print(f"{'='*60}")
             
-            # 获取所有docx文件
-            files = list(year_path.glob("*.docx")) + list(year_path.glob("*.doc"))
-            files.sort()
-            
-            for file_path in files:
+            for entry in entries:
                 results["total"] += 1
-                filename = file_path.name
+                filename = entry.name
                 
                 # 检查是否需要排除
                 if self.should_exclude_file(filename):
@@ -229,7 +412,8 @@ class CountyNameExtractor:
                 
                 # 提取县名
                 print(f"\n处理: {filename}")
-                county_name, extract_method = self.extract_county_name(file_path)
+                file_path = Path(entry.path)
+                county_name, extract_method = extracted[entry.path]
                 
                 if not county_name:
                     print(f"  ❌ 未能提取县名")
@@ -244,7 +428,6 @@ class CountyNameExtractor:
                 
                 # 生成新文件名
                 new_filename = f"{county_name}.docx"
-                new_file_path = output_dir / new_filename
                 
                 print(f"  ✅ 县名: {county_name} ({extract_method})")
                 print(f"  📝 新文件: {new_filename}")
@@ -253,14 +436,18 @@ class CountyNameExtractor:
                 if not dry_run:
                     # 如果文件已存在，添加序号
                     counter = 1
-                    while new_file_path.exists():
+                    while new_filename in existing:
                         new_filename = f"{county_name}_{counter}.docx"
-                        new_file_path = output_dir / new_filename
                         counter += 1
+                    new_file_path = output_dir / new_filename
+                    existing.add(new_filename)
                     
                     try:
-                        shutil.copy2(file_path, new_file_path)
-                        print(f"  💾 已复制")
+                        if link and _link_or_copy(file_path, new_file_path):
+                            print(f"  🔗 已链接")
+                        else:
+                            shutil.copy2(file_path, new_file_path)
+                            print(f"  💾 已复制")
                     except Exception as e:
                         print(f"  ⚠️  复制失败: {e}")
                         results["failed"] += 1
@@ -289,6 +476,29 @@ class CountyNameExtractor:
         return results
 
 
+# 子进程中复用的提取器
+_worker_extractor: Optional[CountyNameExtractor] = None
+
+
+def _init_worker(base_dir: Path):
+    global _worker_extractor
+    _worker_extractor = CountyNameExtractor(base_dir)
+
+
+def _extract_worker(file_path: str) -> Tuple[Optional[str], str]:
+    return _worker_extractor.extract_county_name(Path(file_path))
+
+
+def _dump_json(data, json_path: Path):
+    """保存JSON（UTF-8，缩进2格）"""
+    if HAS_ORJSON:
+        with open(json_path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
 def generate_report(results: Dict, output_path: Path):
     """生成处理报告"""
     report_lines = [
@@ -316,26 +526,22 @@ def generate_report(results: Dict, output_path: Path):
             by_year[year] = []
         by_year[year].append(detail)
     
-    for year in sorted(by_year.keys()):
-        report_lines.append(f"\n【{year}】")
-        for detail in by_year[year]:
-            status_icon = "✅" if detail['状态'] == "成功" else "❌" if detail['状态'] == "失败" else "🚫"
-            report_lines.append(f"{status_icon} {detail['原文件']}")
-            if detail['状态'] == "成功":
-                report_lines.append(f"   → {detail['新文件']} (提取自: {detail['提取方式']})")
-            else:
-                report_lines.append(f"   → {detail.get('原因', '未知原因')}")
-    
-    report_text = "\n".join(report_lines)
-    
-    # 保存报告
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(report_text)
+    # 保存报告：逐行写入文件，不先拼接整份报告
+    with open(output_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        f.write("\n".join(report_lines))
+        for year in sorted(by_year.keys()):
+            f.write(f"\n\n【{year}】")
+            for detail in by_year[year]:
+                status_icon = "✅" if detail['状态'] == "成功" else "❌" if detail['状态'] == "失败" else "🚫"
+                f.write(f"\n{status_icon} {detail['原文件']}")
+                if detail['状态'] == "成功":
+                    f.write(f"\n   → {detail['新文件']} (提取自: {detail['提取方式']})")
+                else:
+                    f.write(f"\n   → {detail.get('原因', '未知原因')}")
     
     # 同时保存JSON格式
     json_path = output_path.with_suffix('.json')
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+    _dump_json(results, json_path)
     
     print(f"\n📄 报告已保存:")
     print(f"  - 文本格式: {output_path}")
@@ -348,6 +554,9 @@ def main():
     parser = argparse.ArgumentParser(description="832案例文件提取与重命名工具")
     parser.add_argument("--dry-run", action="store_true", help="预览模式，不实际复制文件")
     parser.add_argument("--output", type=str, default="案例补充", help="输出文件夹名称（默认: 案例补充）")
+    parser.add_argument("--workers", type=int, default=None, help="并行提取县名的进程数（默认: CPU核数）")
+    parser.add_argument("--link", action="store_true",
+                        help="用硬链接代替复制（不占额外空间；注意修改输出文件会同时修改原文件）")
     args = parser.parse_args()
     
     # 设置路径
@@ -364,7 +573,9 @@ def main():
     
     # 创建提取器并处理
     extractor = CountyNameExtractor(base_dir)
-    results = extractor.process_all_files(output_dir, dry_run=args.dry_run)
+    results = extractor.process_all_files(
+        output_dir, dry_run=args.dry_run, max_workers=args.workers, link=args.link
+    )
     
     # 生成报告
     print(f"\n{'='*80}")
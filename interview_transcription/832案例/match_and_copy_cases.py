@@ -13,12 +13,80 @@
     python match_and_copy_cases.py --dry-run  # 预览模式
 """
 
+import os
 import re
 import shutil
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from collections import defaultdict
+from functools import lru_cache
+from operator import attrgetter
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 import json
 
+# 优先使用 orjson 写JSON报告（C实现，带缩进输出也很快）
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+# 文件夹名开头的日期：YYYYMMDD-YYYYMMDD、YYYYMMDD-MMDD、MMDD 或 MMDD-DDDD、纯数字
+_DATE_PREFIX = re.compile(r'^(?:\d{8}-\d{8}|\d{8}-\d{4}|\d{4}(?:-\d{4})?|\d+)')
+# 括号内的所有内容（包括日期和地名）
+_PAREN_CONTENT = re.compile(r'[（(][^）)]+[）)]')
+
+# 提取县名的多种模式（优先级从高到低），合成一个正则只扫描一次；
+# 每个分支中县名所在的分组以分支名命名，命中后用 lastgroup 取出
+# 合成正则返回最靠前的命中，若其后还有更高优先级模式的命中，再按优先级逐个查找
+_DIR_COUNTY_PATTERNS = (
+    # 省+州+县（如：云南省文山州丘北县）
+    r'[\u4e00-\u9fa5]+省[^\u4e00-\u9fa5]*[\u4e00-\u9fa5]+州[^\u4e00-\u9fa5]*(?P<prov_zhou_county>[\u4e00-\u9fa5]+(?:县|自治县|市|区|旗|自治旗|特区))',
+    # 省+市+县（完整）
+    r'[\u4e00-\u9fa5]+省[^\u4e00-\u9fa5]*[\u4e00-\u9fa5]+市[^\u4e00-\u9fa5]*(?P<prov_city_county>[\u4e00-\u9fa5]+(?:县|自治县|市|区|旗|自治旗|特区))',
+    # 州+县（如：文山州丘北县）
+    r'[\u4e00-\u9fa5]+州[^\u4e00-\u9fa5]*(?P<zhou_county>[\u4e00-\u9fa5]+(?:县|自治县|市|区|旗|自治旗|特区))',
+    # 省+县
+    r'[\u4e00-\u9fa5]+省[^\u4e00-\u9fa5]*(?P<prov_county>[\u4e00-\u9fa5]+(?:县|自治县|市|区|旗|自治旗|特区))',
+    # 市+县
+    r'[\u4e00-\u9fa5]+市[^\u4e00-\u9fa5]*(?P<city_county>[\u4e00-\u9fa5]+(?:县|自治县|市|区|旗|自治旗|特区))',
+    # 只有县名
+    r'(?P<county_only>[\u4e00-\u9fa5]{2,}(?:县|自治县|区|旗|自治旗|特区|市))',
+)
+_DIR_COUNTY = re.compile('|'.join(_DIR_COUNTY_PATTERNS))
+_DIR_COUNTY_BRANCHES = tuple(re.compile(p) for p in _DIR_COUNTY_PATTERNS)
+_DIR_COUNTY_RANK = {name: rank for rank, p in enumerate(_DIR_COUNTY_BRANCHES) for name in p.groupindex}
+# 下标为 k 的元素：优先级高于第 k 个模式的所有模式
+_DIR_COUNTY_HIGHER = (None,) + tuple(
+    re.compile('|'.join(_DIR_COUNTY_PATTERNS[:k])) for k in range(1, len(_DIR_COUNTY_PATTERNS))
+)
+_ZHOU_PREFIX = re.compile(r'^[\u4e00-\u9fa5]+州')
+
+# 县名标准化：省市州前缀
+_NORM_PROV_CITY = re.compile(r'^[\u4e00-\u9fa5]+省[\u4e00-\u9fa5]+市')
+_NORM_PROV_OR_CITY = re.compile(r'^[\u4e00-\u9fa5]+(省|市|州)')
+# 不带后缀的省名，按长度从长到短排列，保证较长的名称优先匹配
+_PROVINCES = sorted([
+    "河北", "山西", "辽宁", "吉林", "黑龙江", "江苏", "浙江", "安徽", "福建", "江西",
+    "山东", "河南", "湖北", "湖南", "广东", "海南", "四川", "贵州", "云南", "陕西",
+    "甘肃", "青海", "台湾", "广西", "西藏", "宁夏", "新疆", "内蒙古",
+], key=len, reverse=True)
+_NORM_BARE_PROV = re.compile(r'^(?:' + '|'.join(_PROVINCES) + ')')
+
+# 县名后缀（用于提取核心名）
+_SUFFIX_STRIP = re.compile(r'(自治县|自治旗|特区|县|市|区|旗)$')
+_CORE_SUFFIXES = tuple(
+    (suffix, re.compile(r'(' + re.escape(suffix) + r')(?:_\d+)?$'))
+    for suffix in ('自治县', '自治旗', '特区', '县', '市', '区', '旗')
+)
+
+
+def _substrings(text: str, min_len: int) -> Iterator[str]:
+    """生成 text 中长度不小于 min_len 的所有子串"""
+    for i in range(len(text)):
+        for j in range(i + min_len, len(text) + 1):
+            yield text[i:j]
+
 
 class CountyCaseMatcher:
     """县案例匹配器"""
@@ -26,8 +94,56 @@ class CountyCaseMatcher:
     def __init__(self, input_text_dir: Path, case_dir: Path):
         self.input_text_dir = input_text_dir
         self.case_dir = case_dir
+        # 案例目录只扫描一次：(案例路径, 标准化名, 核心名)
+        self._cases = self._load_cases()
+        self._build_index()
+        
+    def _load_cases(self) -> List[Tuple[Path, str, str]]:
+        """扫描案例补充文件夹，预先计算每个案例的标准化名和核心名"""
+        if not self.case_dir.exists():
+            return []
+        
+        cases = []
+        with os.scandir(self.case_dir) as it:
+            for entry in it:
+                if not entry.name.endswith('.docx') or not entry.is_file():
+                    continue
+                # 标准化案例文件名（不含扩展名）
+                normalized_case = self.normalize_county_name(entry.name[:-5])
+                # 提取案例文件名核心部分
+                case_core = _SUFFIX_STRIP.sub('', normalized_case)
+                cases.append((Path(entry.path), normalized_case, case_core))
+        return cases
+    
+    def _build_index(self):
+        """
+        为案例名建立倒排索引（值为 self._cases 中的下标）
         
-    def extract_county_from_dirname(self, dirname: str) -> Optional[str]:
+        匹配策略中的包含关系都是子串判断，因此按子串建索引：
+        - _by_normalized / _by_core: 完整的标准化名 / 核心名
+        - _by_normalized_sub: 标准化名中长度>=3的所有子串（策略3）
+        - _by_core_sub: 核心名中长度>=2的所有子串（策略2、4）
+        """
+        self._by_normalized = defaultdict(set)
+        self._by_core = defaultdict(set)
+        self._by_normalized_sub = defaultdict(set)
+        self._by_core_sub = defaultdict(set)
+        
+        for idx, (_, normalized_case, case_core) in enumerate(self._cases):
+            # 与匹配时的规则一致：核心名太短的案例不参与匹配
+            if len(case_core) < 2:
+                continue
+            self._by_normalized[normalized_case].add(idx)
+            self._by_core[case_core].add(idx)
+            for sub in _substrings(normalized_case, 3):
+                self._by_normalized_sub[sub].add(idx)
+            for sub in _substrings(case_core, 2):
+                self._by_core_sub[sub].add(idx)
+    
+    # 以下纯字符串处理按输入缓存：同一名称（如共同的省市前缀）只计算一次
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def extract_county_from_dirname(dirname: str) -> Optional[str]:
         """
         从input_text的文件夹名中提取县名
         
@@ -39,50 +155,29 @@ class CountyCaseMatcher:
         - 20240723-240724贵州-遵义市-正安县
         - 0809六枝特区（贵州省六盘水市）
         """
-        # 移除日期部分（各种格式）
-        # 格式1: 开头的日期 MMDD 或 MMDD-DDDD
-        text = re.sub(r'^\d{4}(-\d{4})?', '', dirname)
-        # 格式2: 开头的 YYYYMMDD-YYYYMMDD
-        text = re.sub(r'^\d{8}-\d{8}', '', text)
-        # 格式3: 开头的 YYYYMMDD-MMDD
-        text = re.sub(r'^\d{8}-\d{4}', '', text)
-        # 格式4: 括号内的所有内容（包括日期和地名）
-        text = re.sub(r'[（(][^）)]+[）)]', '', text)
-        # 格式5: 开头的纯数字
-        text = re.sub(r'^\d+', '', text)
+        # 移除日期部分和括号内容
+        text = _DATE_PREFIX.sub('', dirname)
+        text = _PAREN_CONTENT.sub('', text)
         
         # 移除其他干扰字符
         text = text.strip('- ')
         
-        # 提取县名的多种模式（优先级从高到低）
-        patterns = [
-            # 省+州+县（如：云南省文山州丘北县）
-            r'([\u4e00-\u9fa5]+省)[^\u4e00-\u9fa5]*([\u4e00-\u9fa5]+州)[^\u4e00-\u9fa5]*([\u4e00-\u9fa5]+(县|自治县|市|区|旗|自治旗|特区))',
-            # 省+市+县（完整）
-            r'([\u4e00-\u9fa5]+省)[^\u4e00-\u9fa5]*([\u4e00-\u9fa5]+市)[^\u4e00-\u9fa5]*([\u4e00-\u9fa5]+(县|自治县|市|区|旗|自治旗|特区))',
-            # 州+县（如：文山州丘北县）
-            r'([\u4e00-\u9fa5]+州)[^\u4e00-\u9fa5]*([\u4e00-\u9fa5]+(县|自治县|市|区|旗|自治旗|特区))',
-            # 省+县
-            r'([\u4e00-\u9fa5]+省)[^\u4e00-\u9fa5]*([\u4e00-\u9fa5]+(县|自治县|市|区|旗|自治旗|特区))',
-            # 市+县
-            r'([\u4e00-\u9fa5]+市)[^\u4e00-\u9fa5]*([\u4e00-\u9fa5]+(县|自治县|市|区|旗|自治旗|特区))',
-            # 只有县名
-            r'([\u4e00-\u9fa5]{2,}(县|自治县|区|旗|自治旗|特区|市))',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text)
-            if match:
-                groups = match.groups()
-                # 返回最后一个分组（县名），并确保去掉州前缀
-                county = groups[-2] if len(groups) > 1 else groups[0]
-                # 如果县名中还包含"州"，移除它
-                county = re.sub(r'^[\u4e00-\u9fa5]+州', '', county)
-                return county
+        # 提取县名（各模式合成的一个正则，按优先级排列分支）
+        match = _DIR_COUNTY.search(text)
+        if match:
+            rank = _DIR_COUNTY_RANK[match.lastgroup]
+            if rank and _DIR_COUNTY_HIGHER[rank].search(text, match.start() + 1):
+                match = next(m for m in (p.search(text) for p in _DIR_COUNTY_BRANCHES) if m)
+            county = match.group(match.lastgroup)
+            # 如果县名中还包含"州"，移除它
+            county = _ZHOU_PREFIX.sub('', county)
+            return county
         
         return None
     
-    def normalize_county_name(self, county_name: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def normalize_county_name(county_name: str) -> str:
         """
         标准化县名，用于匹配
         
@@ -94,26 +189,27 @@ class CountyCaseMatcher:
         
         # 移除省市州前缀（带或不带"省"/"市"/"州"字）
         # 先移除完整的"XX省XX市"格式
-        name = re.sub(r'^[\u4e00-\u9fa5]+省[\u4e00-\u9fa5]+市', '', name)
+        name = _NORM_PROV_CITY.sub('', name)
         # 再移除单独的"XX省"或"XX市"或"XX州"
-        name = re.sub(r'^[\u4e00-\u9fa5]+(省|市|州)', '', name)
+        name = _NORM_PROV_OR_CITY.sub('', name)
         # 移除不带后缀的省名（如"河北"、"广西"等）
-        name = re.sub(r'^(河北|山西|辽宁|吉林|黑龙江|江苏|浙江|安徽|福建|江西|山东|河南|湖北|湖南|广东|海南|四川|贵州|云南|陕西|甘肃|青海|台湾|广西|西藏|宁夏|新疆|内蒙古)', '', name)
+        name = _NORM_BARE_PROV.sub('', name)
         
         return name.strip()
     
-    def extract_county_core(self, county_name: str) -> Optional[str]:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def extract_county_core(county_name: str) -> Optional[str]:
         """
         提取县名核心部分（用于处理如"退耕还林政策下水城区"这类情况）
         
         返回: 县名核心（如"水城"），如果无法提取则返回None
         """
         # 查找县名后缀
-        suffixes = ['自治县', '自治旗', '特区', '县', '市', '区', '旗']
-        for suffix in suffixes:
+        for suffix, suffix_pattern in _CORE_SUFFIXES:
             if county_name.endswith(suffix) or county_name.endswith(suffix + '_1') or county_name.endswith(suffix + '_2'):
                 # 移除后缀和序号
-                core = re.sub(r'(' + re.escape(suffix) + r')(?:_\d+)?$', '', county_name)
+                core = suffix_pattern.sub('', county_name)
                 # 如果核心部分太长（>8个字），可能包含描述性文字，取最后2-4个字
                 if len(core) > 8:
                     core = core[-4:] if len(core[-4:]) > 2 else core[-2:]
@@ -126,87 +222,96 @@ class CountyCaseMatcher:
         
         返回: 匹配的案例文件路径列表
         """
-        if not self.case_dir.exists():
-            return []
-        
         # 标准化县名用于匹配
         normalized_county = self.normalize_county_name(county_name)
         
         # 提取县名核心部分（去掉后缀）
-        county_core = re.sub(r'(县|自治县|市|区|旗|自治旗|特区)$', '', normalized_county)
+        county_core = _SUFFIX_STRIP.sub('', normalized_county)
         
-        matching_files = []
+        # 跳过明显不匹配的（名字太短）
+        if len(county_core) < 2:
+            return []
         
-        # 遍历案例补充文件夹中的所有文件
-        for case_file in self.case_dir.glob("*.docx"):
-            case_filename = case_file.stem  # 不含扩展名的文件名
-            
-            # 标准化案例文件名
-            normalized_case = self.normalize_county_name(case_filename)
-            
-            # 提取案例文件名核心部分
-            case_core = re.sub(r'(县|自治县|市|区|旗|自治旗|特区)$', '', normalized_case)
-            
-            # 跳过明显不匹配的（名字太短或差异太大）
-            if len(case_core) < 2 or len(county_core) < 2:
-                continue
-            
-            # 匹配策略1: 完全匹配（最精确）
-            if normalized_county == normalized_case:
-                matching_files.append(case_file)
-                continue
-            
-            # 匹配策略2: 核心名称完全匹配（处理"县"vs"市"等情况）
-            if county_core == case_core and len(county_core) >= 2:
-                matching_files.append(case_file)
-                continue
-            
-            # 匹配策略3: 完整县名包含匹配（处理"退耕还林政策下水城区"这类情况）
-            # 检查案例文件名是否包含查找的县名
-            if len(normalized_county) >= 3 and normalized_county in normalized_case:
-                matching_files.append(case_file)
-                continue
-            
-            # 匹配策略4: 县名核心在案例中
-            # 2个字的县名也很常见（如务川、灵璧等），但要避免单字匹配
-            if len(county_core) >= 2 and county_core in case_core:
-                # 如果县名只有2个字，确保是完整匹配或案例以此开头
-                if len(county_core) == 2:
-                    if case_core == county_core or case_core.startswith(county_core):
-                        matching_files.append(case_file)
-                        continue
-                else:
-                    matching_files.append(case_file)
-                    continue
-            
-            # 匹配策略5: 案例核心在县名中
-            # 允许2个字的案例名，但需要完整匹配或县名以此开头
-            if len(case_core) >= 2 and case_core in county_core:
-                if len(case_core) == 2:
-                    if county_core == case_core or county_core.startswith(case_core):
-                        matching_files.append(case_file)
-                        continue
-                else:
-                    matching_files.append(case_file)
-                    continue
+        # 通过倒排索引找出候选案例，再逐个确认匹配策略
+        candidates = set(self._by_normalized.get(normalized_county, ()))
+        if len(normalized_county) >= 3:
+            candidates |= self._by_normalized_sub.get(normalized_county, set())
+        candidates |= self._by_core_sub.get(county_core, set())
+        for sub in _substrings(county_core, 2):
+            candidates |= self._by_core.get(sub, set())
         
-        return matching_files
+        # 按案例目录中的顺序返回
+        return [
+            self._cases[idx][0]
+            for idx in sorted(candidates)
+            if self._is_match(normalized_county, county_core, self._cases[idx][1], self._cases[idx][2])
+        ]
+    
+    @staticmethod
+    def _is_match(normalized_county: str, county_core: str,
+                  normalized_case: str, case_core: str) -> bool:
+        """判断县名与案例名是否匹配"""
+        # 跳过明显不匹配的（名字太短或差异太大）
+        if len(case_core) < 2 or len(county_core) < 2:
+            return False
+        
+        # 匹配策略1: 完全匹配（最精确）
+        if normalized_county == normalized_case:
+            return True
+        
+        # 匹配策略2: 核心名称完全匹配（处理"县"vs"市"等情况）
+        if county_core == case_core and len(county_core) >= 2:
+            return True
+        
+        # 匹配策略3: 完整县名包含匹配（处理"退耕还林政策下水城区"这类情况）
+        # 检查案例文件名是否包含查找的县名
+        if len(normalized_county) >= 3 and normalized_county in normalized_case:
+            return True
+        
+        # 匹配策略4: 县名核心在案例中
+        # 2个字的县名也很常见（如务川、灵璧等），但要避免单字匹配
+        if len(county_core) >= 2 and county_core in case_core:
+            # 如果县名只有2个字，确保是完整匹配或案例以此开头
+            if len(county_core) == 2:
+                if case_core == county_core or case_core.startswith(county_core):
+                    return True
+            else:
+                return True
+        
+        # 匹配策略5: 案例核心在县名中
+        # 允许2个字的案例名，但需要完整匹配或县名以此开头
+        if len(case_core) >= 2 and case_core in county_core:
+            if len(case_core) == 2:
+                if county_core == case_core or county_core.startswith(case_core):
+                    return True
+            else:
+                return True
+        
+        return False
     
     def copy_case_to_county(
         self, 
         case_file: Path, 
         county_dir: Path,
-        dry_run: bool = False
+        dry_run: bool = False,
+        existing: Optional[Set[str]] = None
     ) -> Tuple[bool, str]:
         """
         复制案例文件到县文件夹
         
+        参数:
+            existing: 县文件夹中已有的文件名集合（可选）；提供时用它判断重名，
+                      复制成功后会把新文件名加入集合
+        
         返回: (成功标志, 消息)
         """
         target_file = county_dir / case_file.name
         
         # 检查目标文件是否已存在
-        if target_file.exists():
+        if existing is not None:
+            if case_file.name in existing:
+                return False, "文件已存在"
+        elif target_file.exists():
             return False, "文件已存在"
         
         if dry_run:
@@ -214,6 +319,8 @@ class CountyCaseMatcher:
         
         try:
             shutil.copy2(case_file, target_file)
+            if existing is not None:
+                existing.add(case_file.name)
             return True, f"✅ 已复制: {case_file.name}"
         except Exception as e:
             return False, f"❌ 复制失败: {e}"
@@ -233,7 +340,9 @@ class CountyCaseMatcher:
         }
         
         # 获取所有县文件夹
-        county_dirs = sorted([d for d in self.input_text_dir.iterdir() if d.is_dir()])
+        with os.scandir(self.input_text_dir) as it:
+            county_dirs = [entry for entry in it if entry.is_dir(follow_symlinks=False)]
+        county_dirs.sort(key=attrgetter('name'))
         results["total_counties"] = len(county_dirs)
         
         print(f"\n{'='*80}")
@@ -245,8 +354,8 @@ class CountyCaseMatcher:
         print(f"🔍 模式: {'预览模式（不复制文件）' if dry_run else '正式模式（将复制文件）'}")
         print()
         
-        for county_dir in county_dirs:
-            dirname = county_dir.name
+        for county_entry in county_dirs:
+            dirname = county_entry.name
             
             # 提取县名
             county_name = self.extract_county_from_dirname(dirname)
@@ -284,9 +393,12 @@ class CountyCaseMatcher:
             
             results["matched_counties"] += 1
             copied_count = 0
+            county_dir = Path(county_entry.path)
+            # 一次列出县文件夹中已有的文件，代替逐个 exists() 检查
+            existing = set(os.listdir(county_dir))
             
             for case_file in matching_cases:
-                success, msg = self.copy_case_to_county(case_file, county_dir, dry_run)
+                success, msg = self.copy_case_to_county(case_file, county_dir, dry_run, existing)
                 print(f"   {msg}")
                 if success:
                     copied_count += 1
@@ -304,6 +416,16 @@ class CountyCaseMatcher:
         return results
 
 
+def _dump_json(data, json_path: Path):
+    """保存JSON（UTF-8，缩进2格）"""
+    if HAS_ORJSON:
+        with open(json_path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
 def generate_report(results: Dict, output_path: Path):
     """生成处理报告"""
     report_lines = [
@@ -328,40 +450,37 @@ def generate_report(results: Dict, output_path: Path):
     unmatched = [d for d in results['details'] if d['状态'] == '未找到匹配']
     no_extract = [d for d in results['details'] if d['状态'] == '未提取县名']
     
-    # 匹配成功的
-    if matched:
-        report_lines.append("\n【匹配成功的县】")
-        for detail in matched:
-            report_lines.append(f"\n✅ {detail['文件夹']}")
-            report_lines.append(f"   县名: {detail['提取县名']}")
-            report_lines.append(f"   匹配案例: {detail['匹配案例']}个")
-            report_lines.append(f"   复制成功: {detail['复制成功']}个")
-            for case_file in detail['案例文件']:
-                report_lines.append(f"   - {case_file}")
-    
-    # 未找到匹配的
-    if unmatched:
-        report_lines.append("\n【未找到匹配的县】")
-        for detail in unmatched:
-            report_lines.append(f"\n❌ {detail['文件夹']}")
-            report_lines.append(f"   县名: {detail['提取县名']}")
-    
-    # 未提取县名的
-    if no_extract:
-        report_lines.append("\n【未能提取县名的文件夹】")
-        for detail in no_extract:
-            report_lines.append(f"\n⚠️  {detail['文件夹']}")
-    
-    report_text = "\n".join(report_lines)
-    
-    # 保存报告
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(report_text)
+    # 保存报告：逐行写入文件，不先拼接整份报告
+    with open(output_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        f.write("\n".join(report_lines))
+        
+        # 匹配成功的
+        if matched:
+            f.write("\n\n【匹配成功的县】")
+            for detail in matched:
+                f.write(f"\n\n✅ {detail['文件夹']}")
+                f.write(f"\n   县名: {detail['提取县名']}")
+                f.write(f"\n   匹配案例: {detail['匹配案例']}个")
+                f.write(f"\n   复制成功: {detail['复制成功']}个")
+                for case_file in detail['案例文件']:
+                    f.write(f"\n   - {case_file}")
+        
+        # 未找到匹配的
+        if unmatched:
+            f.write("\n\n【未找到匹配的县】")
+            for detail in unmatched:
+                f.write(f"\n\n❌ {detail['文件夹']}")
+                f.write(f"\n   县名: {detail['提取县名']}")
+        
+        # 未提取县名的
+        if no_extract:
+            f.write("\n\n【未能提取县名的文件夹】")
+            for detail in no_extract:
+                f.write(f"\n\n⚠️  {detail['文件夹']}")
     
     # 同时保存JSON格式
     json_path = output_path.with_suffix('.json')
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+    _dump_json(results, json_path)
     
     print(f"\n📄 报告已保存:")
     print(f"  - 文本格式: {output_path}")
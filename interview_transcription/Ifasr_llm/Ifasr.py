@@ -32,7 +32,11 @@ API_GET_RESULT = "/v2/getResult"
 
 
 class XfyunAsrClient:
-    def __init__(self, appid, access_key_id, access_key_secret, audio_file_path):
+    def __init__(self, appid, access_key_id, access_key_secret, audio_file_path, session=None):
+        """
+        session: 可选的 requests.Session，批量处理多个文件时传入同一个会话以复用HTTP连接；
+                 不传则每次请求单独建立连接
+        """
         self.appid = appid
         self.access_key_id = access_key_id
         self.access_key_secret = access_key_secret
@@ -43,6 +47,9 @@ class XfyunAsrClient:
         self.last_base_string = ""  # 签名原始串（编码后）
         self.last_signature = ""    # 最终签名
         self.upload_url = ""        # 最终生成的请求URL
+        self.result_bytes = None    # 转写完成时接口返回的原始响应体（字节）
+        self._query_request = None  # 查询转写结果的 (URL, 请求头)，首次查询时生成
+        self.http = session if session is not None else requests
 
     def _check_audio_path(self, path):
         if not os.path.exists(path):
@@ -178,7 +185,7 @@ class XfyunAsrClient:
             audio_data = f.read()
 
         try:
-            response = requests.post(
+            response = self.http.post(
                 url=self.upload_url,
                 headers=headers,
                 data=audio_data,
@@ -212,14 +219,8 @@ class XfyunAsrClient:
         print(f"上传成功！订单ID：{self.order_id}")
         return result
 
-    def get_transcribe_result(self):
-        """查询音频转写结果（轮询直到完成/超时）"""
-        if not self.order_id:
-            print("未检测到订单ID，自动执行上传流程...")
-            self.upload_audio()
-        if not self.order_id:
-            raise Exception("未获取到订单ID，无法查询转写结果")
-
+    def _build_query_request(self):
+        """构建查询转写结果的请求URL和请求头（同一订单的多次查询复用）"""
         # 构建查询参数
         query_params = {
             "appId": self.appid,
@@ -244,52 +245,82 @@ class XfyunAsrClient:
             encoded_v = urllib.parse.quote(str(v), safe='')
             encoded_query_params.append(f"{encoded_key}={encoded_v}")
         query_url = f"{LFASR_HOST}{API_GET_RESULT}?{'&'.join(encoded_query_params)}"
+        return query_url, query_headers
+
+    def query_transcribe_result(self):
+        """
+        查询一次转写结果（需已上传音频）
+
+        Returns:
+            转写完成时返回接口结果；仍在处理中时返回None
+        转写失败或接口出错时抛出异常
+        """
+        if not self.order_id:
+            raise Exception("未获取到订单ID，无法查询转写结果")
+        if self._query_request is None:
+            self._query_request = self._build_query_request()
+        query_url, query_headers = self._query_request
+
+        try:
+            response = self.http.post(
+                url=query_url,
+                headers=query_headers,
+                data=json.dumps({}),
+                timeout=15,
+                verify=False
+            )
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"查询请求网络失败：{str(e)}")
+
+        try:
+            result = json.loads(response.text)
+            print(result)
+        except json.JSONDecodeError:
+            raise Exception(f"查询响应非JSON数据：{response.text}")
+
+        if result.get("code") != "000000":
+            raise Exception(f"查询失败（API错误）：{result.get('descInfo', '未知错误')}")
+
+        # 转写状态：3=处理中，4=完成，-1=失败
+        process_status = result["content"]["orderInfo"]["status"]
+        fail_type = result["content"]["orderInfo"].get("failType", 0)
+        
+        if process_status == 4:
+            print("转写完成！")
+            self.result_bytes = response.content
+            return result
+        elif process_status == -1:
+            # 转写失败，显示详细错误信息
+            fail_type_msg = {
+                0: "未知错误",
+                1: "音频质量过差",
+                2: "音频时长超限",
+                3: "音频格式不支持", 
+                4: "音频内容违规",
+                5: "服务异常或其他错误"
+            }.get(fail_type, f"未知错误类型({fail_type})")
+            raise Exception(f"转写失败：failType={fail_type} - {fail_type_msg}")
+        elif process_status != 3:
+            raise Exception(f"转写异常：状态码={process_status}，描述={result.get('descInfo')}")
+
+        return None
+
+    def get_transcribe_result(self):
+        """查询音频转写结果（轮询直到完成/超时）"""
+        if not self.order_id:
+            print("未检测到订单ID，自动执行上传流程...")
+            self.upload_audio()
+        if not self.order_id:
+            raise Exception("未获取到订单ID，无法查询转写结果")
 
         # 轮询查询
         max_retry = 10000
         retry_count = 0
         while retry_count < max_retry:
-            try:
-                response = requests.post(
-                    url=query_url,
-                    headers=query_headers,
-                    data=json.dumps({}),
-                    timeout=15,
-                    verify=False
-                )
-                response.raise_for_status()
-            except requests.exceptions.RequestException as e:
-                raise Exception(f"查询请求网络失败：{str(e)}")
-
-            try:
-                result = json.loads(response.text)
-                print(result)
-            except json.JSONDecodeError:
-                raise Exception(f"查询响应非JSON数据：{response.text}")
-
-            if result.get("code") != "000000":
-                raise Exception(f"查询失败（API错误）：{result.get('descInfo', '未知错误')}")
-
-            # 转写状态：3=处理中，4=完成，-1=失败
-            process_status = result["content"]["orderInfo"]["status"]
-            fail_type = result["content"]["orderInfo"].get("failType", 0)
-            
-            if process_status == 4:
-                print("转写完成！")
+            result = self.query_transcribe_result()
+            if result is not None:
                 return result
-            elif process_status == -1:
-                # 转写失败，显示详细错误信息
-                fail_type_msg = {
-                    0: "未知错误",
-                    1: "音频质量过差",
-                    2: "音频时长超限",
-                    3: "音频格式不支持", 
-                    4: "音频内容违规",
-                    5: "服务异常或其他错误"
-                }.get(fail_type, f"未知错误类型({fail_type})")
-                raise Exception(f"转写失败：failType={fail_type} - {fail_type_msg}")
-            elif process_status != 3:
-                raise Exception(f"转写异常：状态码={process_status}，描述={result.get('descInfo')}")
 
             # 处理中，等待5秒后重试
             retry_count += 1
@@ -1,5 +1,16 @@
 import json
-import re
+from collections import Counter
+from operator import itemgetter
+
+# 优先使用 orjson（C实现，解析大量小段 json_1best 更快）；其 JSONDecodeError 是 json.JSONDecodeError 的子类
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# 按说话人ID排序后依次使用的标签，超出部分按 角色G、角色H... 生成
+_SPEAKER_NAMES = ('访谈者', '受访者', '角色C', '角色D', '角色E', '角色F')
 
 def parse_order_result(api_response, with_speaker=True, debug=False):
     """
@@ -17,11 +28,14 @@ def parse_order_result(api_response, with_speaker=True, debug=False):
         # 从API响应中获取orderResult字段
         order_result_str = api_response.get('content', {}).get('orderResult', '{}')
         
-        # 处理转义字符问题
-        cleaned_str = re.sub(r'\\\\', r'\\', order_result_str)
+        # 处理转义字符问题：多数响应不含双反斜杠，先判断再替换，省去一次整串拷贝
+        if '\\\\' in order_result_str:
+            cleaned_str = order_result_str.replace('\\\\', '\\')
+        else:
+            cleaned_str = order_result_str
         
         # 解析orderResult字符串为JSON对象
-        order_result = json.loads(cleaned_str)
+        order_result = _json_loads(cleaned_str)
         
         if with_speaker:
             return _parse_with_speaker_separation(order_result, debug)
@@ -36,143 +50,194 @@ def parse_order_result(api_response, with_speaker=True, debug=False):
         return ""
 
 
+def _extract_words(st_data):
+    """按固定结构 st.rt[*].ws[*].cw[*].w 拼接一个句段内的全部词"""
+    return ''.join(cw_item['w']
+                   for rt_item in st_data.get('rt', ())
+                   for ws_item in rt_item.get('ws', ())
+                   for cw_item in ws_item.get('cw', ())
+                   if 'w' in cw_item)
+
+
 def _parse_simple(order_result):
     """简单解析：只拼接文本，不区分说话人"""
     w_values = []
     
-    if 'lattice' in order_result:
-        for lattice_item in order_result['lattice']:
-            if 'json_1best' in lattice_item:
-                json_1best = json.loads(lattice_item['json_1best'])
-                
-                if 'st' in json_1best and 'rt' in json_1best['st']:
-                    for rt_item in json_1best['st']['rt']:
-                        if 'ws' in rt_item:
-                            for ws_item in rt_item['ws']:
-                                if 'cw' in ws_item:
-                                    for cw_item in ws_item['cw']:
-                                        if 'w' in cw_item:
-                                            w_values.append(cw_item['w'])
+    for lattice_item in order_result.get('lattice', ()):
+        if 'json_1best' in lattice_item:
+            # 与说话人分离路径一致：json_1best 可能已是解析好的字典
+            json_1best = lattice_item['json_1best']
+            if isinstance(json_1best, str):
+                json_1best = _json_loads(json_1best)
+            
+            if 'st' in json_1best:
+                w_values.append(_extract_words(json_1best['st']))
     
     return ''.join(w_values)
 
 
-def _parse_with_speaker_separation(order_result, debug=False):
+def _collect_segments(lattice_data):
     """
-    解析带说话人分离的结果，使用rl字段（角色分离编号）
+    收集每个句段的信息（生产路径，不含任何调试分支）
     
-    返回格式化的文本，包含：
-    - 说话人标识（基于音色的说话人ID）
-    - 段落分隔
+    返回:
+        (segments, speaker_ids, in_order)：segments 为 (开始时间, 说话人ID, 文本) 元组列表，
+        speaker_ids 为所有唯一的说话人ID集合，in_order 表示句段是否已按开始时间有序
     """
-    # 优先使用lattice2（包含说话人信息），如果不存在则回退到lattice
-    lattice_data = order_result.get('lattice2', order_result.get('lattice', []))
-    
-    if not lattice_data:
-        if debug:
-            print("警告：未找到lattice2或lattice数据")
-        return _parse_simple(order_result)
-    
-    # 检查是否有lattice2（说话人分离结果）
-    has_lattice2 = 'lattice2' in order_result
-    if debug:
-        print(f"{'✓' if has_lattice2 else '✗'} 检测到lattice2数据（说话人分离）")
-    
-    # 收集每个句段的信息
     segments = []
-    speaker_ids = set()  # 收集所有唯一的说话人ID
+    speaker_ids = set()
+    in_order = True
+    last_bg = None
     
     for item in lattice_data:
         try:
             # 解析json_1best
             if 'json_1best' in item:
-                if isinstance(item['json_1best'], str):
-                    json_1best = json.loads(item['json_1best'])
-                else:
-                    json_1best = item['json_1best']
+                json_1best = item['json_1best']
+                if isinstance(json_1best, str):
+                    json_1best = _json_loads(json_1best)
                 
                 st_data = json_1best.get('st', {})
                 
                 # 重要：使用rl字段作为说话人ID（角色分离编号）
                 # rl字段才是真正的说话人标识，pa只是段落编号
-                speaker_id = st_data.get('rl', '0')  # 从json_1best.st.rl字段获取
+                speaker_id = st_data.get('rl', '0')
+                speaker_ids.add(speaker_id)
+                
+                bg = int(item.get('begin', 0))  # 开始时间（毫秒）
+                
+                # 提取该段落的文本；ASR 输出一般没有首尾空白，两端都不是空白时跳过 strip
+                text = _extract_words(st_data)
+                if text and (text[0].isspace() or text[-1].isspace()):
+                    text = text.strip()
+                
+                if text:
+                    # 接口返回的句段通常已按时间有序，收集时顺带检查，有序时可省去排序
+                    if last_bg is not None and bg < last_bg:
+                        in_order = False
+                    last_bg = bg
+                    segments.append((bg, speaker_id, text))
+        
+        except (json.JSONDecodeError, KeyError):
+            continue
+    
+    return segments, speaker_ids, in_order
+
+
+def _collect_segments_debug(lattice_data):
+    """与 _collect_segments 相同，额外打印前几个段落的编号和解析错误"""
+    segments = []
+    speaker_ids = set()
+    in_order = True
+    last_bg = None
+    
+    for item in lattice_data:
+        try:
+            if 'json_1best' in item:
+                json_1best = item['json_1best']
+                if isinstance(json_1best, str):
+                    json_1best = _json_loads(json_1best)
+                
+                st_data = json_1best.get('st', {})
+                
+                speaker_id = st_data.get('rl', '0')
                 speaker_ids.add(speaker_id)
                 
-                if debug and len(segments) < 5:  # 只显示前几条，避免刷屏
+                if len(segments) < 5:  # 只显示前几条，避免刷屏
                     pa_id = st_data.get('pa', 'N/A')
                     print(f"  段落 {len(segments)+1}: pa={pa_id}, rl={speaker_id}")
                 
-                bg = int(item.get('begin', 0))  # 开始时间（毫秒）
-                ed = int(item.get('end', 0))    # 结束时间（毫秒）
+                bg = int(item.get('begin', 0))
                 
-                # 提取该段落的文本
-                text_parts = []
-                if 'rt' in st_data:
-                    for rt_item in st_data['rt']:
-                        if 'ws' in rt_item:
-                            for ws_item in rt_item['ws']:
-                                if 'cw' in ws_item:
-                                    for cw_item in ws_item['cw']:
-                                        if 'w' in cw_item:
-                                            text_parts.append(cw_item['w'])
-                
-                text = ''.join(text_parts).strip()
+                text = _extract_words(st_data)
+                if text and (text[0].isspace() or text[-1].isspace()):
+                    text = text.strip()
                 
                 if text:
-                    segments.append({
-                        'speaker_id': speaker_id,  # 真正的说话人ID
-                        'text': text,
-                        'begin': bg,
-                        'end': ed
-                    })
+                    if last_bg is not None and bg < last_bg:
+                        in_order = False
+                    last_bg = bg
+                    segments.append((bg, speaker_id, text))
         
         except (json.JSONDecodeError, KeyError) as e:
-            if debug:
-                print(f"解析段落时出错: {e}")
+            print(f"解析段落时出错: {e}")
             continue
     
+    return segments, speaker_ids, in_order
+
+
+def _parse_with_speaker_separation(order_result, debug=False):
+    """
+    解析带说话人分离的结果，使用rl字段（角色分离编号）
+    
+    返回格式化的文本，包含：
+    - 说话人标识（基于音色的说话人ID）
+    - 段落分隔
+    """
+    # 优先使用lattice2（包含说话人信息），如果不存在则回退到lattice
+    lattice_data = order_result.get('lattice2', order_result.get('lattice', []))
+    
+    if not lattice_data:
+        if debug:
+            print("警告：未找到lattice2或lattice数据")
+        return _parse_simple(order_result)
+    
+    # 检查是否有lattice2（说话人分离结果）
+    has_lattice2 = 'lattice2' in order_result
+    if debug:
+        print(f"{'✓' if has_lattice2 else '✗'} 检测到lattice2数据（说话人分离）")
+    
+    # 收集每个句段的信息；调试与否在整个调用期间不变，直接选定对应版本，避免逐段判断
+    collect_segments = _collect_segments_debug if debug else _collect_segments
+    segments, speaker_ids, in_order = collect_segments(lattice_data)
+    
     if debug:
         print(f"\n说话人统计：")
         print(f"- 检测到 {len(speaker_ids)} 个不同的说话人ID: {sorted(speaker_ids)}")
         print(f"- 共 {len(segments)} 个语音段落")
     
-    # 按时间排序
-    segments.sort(key=lambda x: x['begin'])
+    # 按时间排序（收集时已确认有序则跳过）
+    if not in_order:
+        segments.sort(key=itemgetter(0))
     
     # 为说话人ID分配标签
     # rl通常是数字字符串，如"0", "1", "2"...
-    speaker_id_to_label = {}
-    speaker_names = ['访谈者', '受访者', '角色C', '角色D', '角色E', '角色F']
-    
-    # 按说话人ID排序，确保一致性
-    sorted_speaker_ids = sorted(speaker_ids, key=lambda x: int(x) if x.isdigit() else x)
+    # 按说话人ID排序，确保一致性：数字ID按数值排在前，其他ID按字符串排在后
+    # 键统一为元组，混有非数字ID时也不会出现 int 与 str 比较的 TypeError
+    if len(speaker_ids) > 1:
+        sorted_speaker_ids = sorted(speaker_ids, key=lambda x: (0, int(x)) if x.isdigit() else (1, x))
+    else:
+        sorted_speaker_ids = list(speaker_ids)
     
+    # 标签与行首前缀【说话人】在同一遍中生成，每个说话人只拼一次
+    speaker_id_to_label = {}
+    prefixes = {}
     for i, sid in enumerate(sorted_speaker_ids):
-        if i < len(speaker_names):
-            speaker_id_to_label[sid] = speaker_names[i]
+        if i < len(_SPEAKER_NAMES):
+            label = _SPEAKER_NAMES[i]
         else:
-            speaker_id_to_label[sid] = f"角色{chr(65+i)}"  # A, B, C, D...
+            label = f"角色{chr(65+i)}"  # A, B, C, D...
+        speaker_id_to_label[sid] = label
+        prefixes[sid] = f"【{label}】"
     
     if debug:
         print(f"\n说话人映射：")
+        # 一遍统计各说话人的段落数，而不是每个说话人各扫一遍全部段落
+        seg_counts = Counter(seg[1] for seg in segments)
         for sid, label in speaker_id_to_label.items():
-            seg_count = sum(1 for seg in segments if seg['speaker_id'] == sid)
-            print(f"  rl={sid} → {label} (共{seg_count}段)")
+            print(f"  rl={sid} → {label} (共{seg_counts[sid]}段)")
     
     # 格式化输出（保持原始分段，由text_cleaner负责合并）
     result_lines = []
     current_speaker = None
     
-    for seg in segments:
-        speaker_id = seg['speaker_id']
-        speaker_label = speaker_id_to_label.get(speaker_id, f"未知角色({speaker_id})")
-        
+    for _, speaker_id, text in segments:
         # 当说话人切换时，添加空行分隔
         if current_speaker is not None and current_speaker != speaker_id:
             result_lines.append("")
         
         # 格式化输出：【说话人】文本
-        result_lines.append(f"【{speaker_label}】{seg['text']}")
+        result_lines.append(prefixes[speaker_id] + text)
         current_speaker = speaker_id
     
     return '\n'.join(result_lines)
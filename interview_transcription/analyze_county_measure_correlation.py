@@ -5,12 +5,28 @@
 用于识别不同类型县在减贫措施上的差异
 """
 
+import io
 import json
-from collections import defaultdict, Counter
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set, TextIO
 import math
 
+# 优先使用 orjson（C实现，直接解析字节更快）；未安装时回退到标准库
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# 可选：安装了 numpy 时，占比表按矩阵一次算出
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
 OUTPUT_DIR = Path(__file__).parent / "output" / "4_poverty_reduction_summary"
 
 # 重点县域标签（按频率排序）
@@ -35,24 +51,41 @@ MEASURE_CATEGORIES = {
     "其他": ["思想扶贫", "内生动力", "移风易俗", "政策感恩"]
 }
 
-# 措施标签到类别的映射
-MEASURE_TAG_TO_CATEGORY = {}
-for category, tags in MEASURE_CATEGORIES.items():
-    for tag in tags:
-        MEASURE_TAG_TO_CATEGORY[tag] = category
+# 措施标签到类别的映射（导入时一次生成）
+MEASURE_TAG_TO_CATEGORY = {tag: category for category, tags in MEASURE_CATEGORIES.items() for tag in tags}
+
+# 类别名列表与未知措施的默认类别，模块级共享，避免各处重复生成
+_CATEGORY_LIST = list(MEASURE_CATEGORIES)
+_OTHER_CATEGORY = '其他'
+
 
+def _load_labels_file(file_path: Path):
+    """
+    读取并解析单个标签文件，返回 (data, error)。
+    异常不在线程内打印，交给主线程按文件顺序统一输出。
+    """
+    try:
+        # JSON 规定为 UTF-8，直接按字节读取交给解析器
+        return _json_loads(file_path.read_bytes()), None
+    except Exception as e:
+        return None, e
 
-def load_all_labels() -> List[Dict]:
-    """加载所有县的标签文件"""
+
+def load_all_labels(max_workers: int = 16) -> List[Dict]:
+    """加载所有县的标签文件（线程池并行读取，结果保持文件顺序）"""
     labels_files = list(OUTPUT_DIR.glob("*_labels.json"))
     results = []
     
-    for file_path in labels_files:
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        loaded = list(executor.map(_load_labels_file, labels_files))
+    
+    for file_path, (data, error) in zip(labels_files, loaded):
+        if error is not None:
+            print(f"⚠️  读取失败: {file_path.name} - {error}")
+            continue
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                data['_file'] = file_path.name
-                results.append(data)
+            data['_file'] = file_path.name
+            results.append(data)
         except Exception as e:
             print(f"⚠️  读取失败: {file_path.name} - {e}")
     
@@ -63,64 +96,83 @@ def analyze_correlation(all_data: List[Dict]) -> Dict:
     """分析县域标签与措施标签的关联关系"""
     
     # 统计每个县域标签对应的措施标签分布（按县计数，不是按措施计数）
-    county_tag_to_measures = defaultdict(lambda: defaultdict(set))  # 使用set避免重复计数
-    county_tag_to_categories = defaultdict(lambda: defaultdict(set))
+    county_tag_to_measures: Dict[str, Counter] = {}
+    county_tag_to_categories: Dict[str, Counter] = {}
     
     # 统计每个县域标签的县数量
     county_tag_counts = Counter()
     
     # 统计总体措施标签分布（按县计数）
-    overall_measures = defaultdict(set)
-    overall_categories = defaultdict(set)
+    overall_measures = Counter()
+    overall_categories = Counter()
+    
+    # 按县名记录已计入的键，同一县名（重复文件或缺少县名）在每个统计项中只计一次：
+    # (总体措施标签, 总体措施类别, (县域标签, 措施标签), (县域标签, 措施类别))
+    seen_by_county = {}
+    
+    # 热循环中反复用到的全局名绑定为局部变量
+    tag_to_category = MEASURE_TAG_TO_CATEGORY.get
+    _isinstance = isinstance
+    _dict = dict
     
     for data in all_data:
         county_name = data.get('county_name', '')
         county_tags = data.get('county_tags', [])
         effective_measures = data.get('effective_measures', [])
         
-        # 收集该县的所有措施类别
-        county_categories = set()
+        seen = seen_by_county.get(county_name)
+        if seen is None:
+            seen = seen_by_county[county_name] = (set(), set(), set(), set())
+        seen_tags, seen_categories, seen_tag_pairs, seen_category_pairs = seen
+        
+        # 每个县只遍历一次措施：同时累计总体分布，并记下 (措施标签, 措施类别) 供各县域标签复用
+        measure_pairs = []
         for measure in effective_measures:
-            if isinstance(measure, dict):
+            if _isinstance(measure, _dict):
                 tag = measure.get('tag', '')
                 if tag:
-                    category = MEASURE_TAG_TO_CATEGORY.get(tag, '其他')
-                    county_categories.add(category)
-                    overall_measures[tag].add(county_name)
-                    overall_categories[category].add(county_name)
+                    category = tag_to_category(tag, _OTHER_CATEGORY)
+                    measure_pairs.append((tag, category))
+                    
+                    if tag not in seen_tags:
+                        seen_tags.add(tag)
+                        overall_measures[tag] += 1
+                    if category not in seen_categories:
+                        seen_categories.add(category)
+                        overall_categories[category] += 1
         
         # 统计每个县域标签对应的措施分布
         for county_tag in county_tags:
             county_tag_counts[county_tag] += 1
+            if not measure_pairs:
+                continue
             
-            for measure in effective_measures:
-                if isinstance(measure, dict):
-                    tag = measure.get('tag', '')
-                    if tag:
-                        category = MEASURE_TAG_TO_CATEGORY.get(tag, '其他')
-                        county_tag_to_measures[county_tag][tag].add(county_name)
-                        county_tag_to_categories[county_tag][category].add(county_name)
-    
-    # 转换为计数
-    county_tag_to_measures_count = {}
-    for county_tag, measures in county_tag_to_measures.items():
-        county_tag_to_measures_count[county_tag] = {tag: len(counties) for tag, counties in measures.items()}
-    
-    county_tag_to_categories_count = {}
-    for county_tag, categories in county_tag_to_categories.items():
-        county_tag_to_categories_count[county_tag] = {cat: len(counties) for cat, counties in categories.items()}
-    
-    overall_measures_count = {tag: len(counties) for tag, counties in overall_measures.items()}
-    overall_categories_count = {cat: len(counties) for cat, counties in overall_categories.items()}
+            # 每个县域标签只取一次计数器；首次出现时再创建
+            measure_counter = county_tag_to_measures.get(county_tag)
+            if measure_counter is None:
+                measure_counter = county_tag_to_measures[county_tag] = Counter()
+            category_counter = county_tag_to_categories.get(county_tag)
+            if category_counter is None:
+                category_counter = county_tag_to_categories[county_tag] = Counter()
+            
+            for tag, category in measure_pairs:
+                key = (county_tag, tag)
+                if key not in seen_tag_pairs:
+                    seen_tag_pairs.add(key)
+                    measure_counter[tag] += 1
+                key = (county_tag, category)
+                if key not in seen_category_pairs:
+                    seen_category_pairs.add(key)
+                    category_counter[category] += 1
     
     total_counties = len(all_data)
     
     return {
         'county_tag_counts': county_tag_counts,
-        'county_tag_to_measures': county_tag_to_measures_count,
-        'county_tag_to_categories': county_tag_to_categories_count,
-        'overall_measures': overall_measures_count,
-        'overall_categories': overall_categories_count,
+        'county_tag_to_measures': county_tag_to_measures,
+        'county_tag_to_categories': county_tag_to_categories,
+        'overall_measures': overall_measures,
+        'overall_categories': overall_categories,
         'total_counties': total_counties
     }
 
@@ -159,35 +211,119 @@ def calculate_significance(county_tag: str, measure_category: str, stats: Dict)
     }
 
 
-def generate_correlation_report(stats: Dict) -> str:
-    """生成关联分析报告"""
-    lines = []
-    lines.append("=" * 80)
-    lines.append("县域标签与减贫措施关联分析报告")
-    lines.append("=" * 80)
-    lines.append(f"\n总县数: {stats['total_counties']}")
+def build_ratio_table(stats: Dict) -> Dict[str, Dict[str, tuple]]:
+    """
+    预先计算重点县域标签 × 措施类别的占比表，报告各部分直接查表
+    
+    返回 {县域标签: {措施类别: (该类型占比, 总体占比, 差异百分点, 是否显著)}}，
+    计算口径与 calculate_significance 一致；没有县的县域标签不出现在表中
+    """
+    total_counties = stats['total_counties']
+    overall_categories = stats['overall_categories']
+    
+    county_tags = []
+    county_counts = []
+    category_stats_list = []
+    for county_tag in KEY_COUNTY_TAGS:
+        county_count = stats['county_tag_counts'].get(county_tag, 0)
+        if county_count == 0:
+            continue
+        county_tags.append(county_tag)
+        county_counts.append(county_count)
+        category_stats_list.append(stats['county_tag_to_categories'][county_tag])
+    
+    if HAS_NUMPY and county_tags:
+        return _build_ratio_table_numpy(county_tags, county_counts, category_stats_list,
+                                        overall_categories, total_counties)
+    
+    table = {}
+    for county_tag, county_count, category_stats in zip(county_tags, county_counts, category_stats_list):
+        row = {}
+        for category in _CATEGORY_LIST:
+            county_ratio = category_stats.get(category, 0) / county_count
+            overall_ratio = overall_categories.get(category, 0) / total_counties if total_counties > 0 else 0
+            diff_percent = (county_ratio - overall_ratio) * 100
+            # 简单的显著性判断：差异超过10个百分点认为显著
+            row[category] = (county_ratio, overall_ratio, diff_percent, abs(diff_percent) > 10)
+        table[county_tag] = row
+    
+    return table
+
+
+def _build_ratio_table_numpy(county_tags: List[str], county_counts: List[int],
+                             category_stats_list: List[Dict], overall_categories: Dict,
+                             total_counties: int) -> Dict[str, Dict[str, tuple]]:
+    """build_ratio_table 的 numpy 版本：整张表用几次矩阵运算算出，结果与逐格计算逐位一致"""
+    categories = _CATEGORY_LIST
+    
+    counts = np.array(county_counts, dtype=np.float64)
+    matrix = np.array([[category_stats.get(category, 0) for category in categories]
+                       for category_stats in category_stats_list], dtype=np.float64)
+    overall = np.array([overall_categories.get(category, 0) for category in categories], dtype=np.float64)
+    if total_counties > 0:
+        overall = overall / total_counties
+    
+    county_ratio = matrix / counts[:, None]
+    diff_percent = (county_ratio - overall[None, :]) * 100
+    # 简单的显著性判断：差异超过10个百分点认为显著
+    significant = np.abs(diff_percent) > 10
+    
+    # 转回 Python 原生类型，报告格式化与纯 Python 版本完全相同
+    overall_list = overall.tolist()
+    table = {}
+    for county_tag, ratio_row, diff_row, sig_row in zip(
+            county_tags, county_ratio.tolist(), diff_percent.tolist(), significant.tolist()):
+        table[county_tag] = dict(zip(categories, zip(ratio_row, overall_list, diff_row, sig_row)))
+    
+    return table
+
+
+def generate_correlation_report(stats: Dict, out: Optional[TextIO] = None) -> Optional[str]:
+    """
+    生成关联分析报告
+    
+    给出 out（已打开的文本文件）时直接逐行写入，不在内存中拼出整份报告，返回 None；
+    否则写入内存缓冲区并返回报告字符串
+    """
+    buffer = None
+    if out is None:
+        out = buffer = io.StringIO()
+    write = out.write
+    
+    def emit(line):
+        # 行与行之间以换行分隔，报告末尾不带多余换行
+        write("\n")
+        write(line)
+    
+    write("=" * 80)
+    emit("县域标签与减贫措施关联分析报告")
+    emit("=" * 80)
+    emit(f"\n总县数: {stats['total_counties']}")
     
     # 总体措施类别分布
-    lines.append("\n" + "=" * 80)
-    lines.append("一、总体措施类别分布（基准）")
-    lines.append("=" * 80)
+    emit("\n" + "=" * 80)
+    emit("一、总体措施类别分布（基准）")
+    emit("=" * 80)
     total = stats['total_counties']
     for category, count in sorted(stats['overall_categories'].items(), key=lambda x: x[1], reverse=True):
         ratio = count / total * 100
-        lines.append(f"  {category:20s} : {count:3d} 个县 ({ratio:5.1f}%)")
+        emit(f"  {category:20s} : {count:3d} 个县 ({ratio:5.1f}%)")
     
     # 重点县域标签的分析
-    lines.append("\n" + "=" * 80)
-    lines.append("二、重点县域标签对应的措施类别分布")
-    lines.append("=" * 80)
+    emit("\n" + "=" * 80)
+    emit("二、重点县域标签对应的措施类别分布")
+    emit("=" * 80)
+    
+    ratio_table = build_ratio_table(stats)
     
     for county_tag in KEY_COUNTY_TAGS:
         county_count = stats['county_tag_counts'].get(county_tag, 0)
         if county_count == 0:
             continue
+        ratio_row = ratio_table[county_tag]
         
-        lines.append(f"\n【{county_tag}】（{county_count}个县）")
-        lines.append("-" * 80)
+        emit(f"\n【{county_tag}】（{county_count}个县）")
+        emit("-" * 80)
         
         # 该县域标签的措施类别分布
         category_stats = stats['county_tag_to_categories'][county_tag]
@@ -195,52 +331,46 @@ def generate_correlation_report(stats: Dict) -> str:
         # 按出现频率排序
         sorted_categories = sorted(category_stats.items(), key=lambda x: x[1], reverse=True)
         
-        lines.append(f"{'措施类别':<20s} {'出现次数':<10s} {'占比':<10s} {'总体占比':<10s} {'差异':<10s} {'显著性'}")
-        lines.append("-" * 80)
+        emit(f"{'措施类别':<20s} {'出现次数':<10s} {'占比':<10s} {'总体占比':<10s} {'差异':<10s} {'显著性'}")
+        emit("-" * 80)
         
         for category, count in sorted_categories:
-            ratio = count / county_count * 100
-            overall_count = stats['overall_categories'].get(category, 0)
-            overall_ratio = overall_count / stats['total_counties'] * 100
+            county_ratio, overall_ratio, _, significant = ratio_row[category]
+            ratio = county_ratio * 100
+            overall_ratio = overall_ratio * 100
             diff = ratio - overall_ratio
             
-            sig_info = calculate_significance(county_tag, category, stats)
-            sig_mark = "★" if sig_info['significant'] else ""
+            sig_mark = "★" if significant else ""
             
-            lines.append(f"{category:<20s} {count:<10d} {ratio:>6.1f}%    {overall_ratio:>6.1f}%    {diff:>+6.1f}%    {sig_mark}")
+            emit(f"{category:<20s} {count:<10d} {ratio:>6.1f}%    {overall_ratio:>6.1f}%    {diff:>+6.1f}%    {sig_mark}")
     
     # 显著性差异总结
-    lines.append("\n" + "=" * 80)
-    lines.append("三、显著性差异总结（差异>10个百分点）")
-    lines.append("=" * 80)
+    emit("\n" + "=" * 80)
+    emit("三、显著性差异总结（差异>10个百分点）")
+    emit("=" * 80)
     
     significant_findings = []
-    for county_tag in KEY_COUNTY_TAGS:
-        county_count = stats['county_tag_counts'].get(county_tag, 0)
-        if county_count == 0:
-            continue
-        
-        for category in MEASURE_CATEGORIES.keys():
-            sig_info = calculate_significance(county_tag, category, stats)
-            if sig_info['significant']:
+    for county_tag, ratio_row in ratio_table.items():
+        for category, (county_ratio, overall_ratio, diff_percent, significant) in ratio_row.items():
+            if significant:
                 significant_findings.append({
                     'county_tag': county_tag,
                     'category': category,
-                    'county_ratio': sig_info['county_ratio'] * 100,
-                    'overall_ratio': sig_info['overall_ratio'] * 100,
-                    'diff': sig_info['diff_percent']
+                    'county_ratio': county_ratio * 100,
+                    'overall_ratio': overall_ratio * 100,
+                    'diff': diff_percent
                 })
     
     if significant_findings:
         # 按差异绝对值排序
         significant_findings.sort(key=lambda x: abs(x['diff']), reverse=True)
         
-        lines.append(f"\n共发现 {len(significant_findings)} 个显著性差异：\n")
-        lines.append(f"{'县域标签':<20s} {'措施类别':<20s} {'该类型占比':<12s} {'总体占比':<12s} {'差异':<10s}")
-        lines.append("-" * 80)
+        emit(f"\n共发现 {len(significant_findings)} 个显著性差异：\n")
+        emit(f"{'县域标签':<20s} {'措施类别':<20s} {'该类型占比':<12s} {'总体占比':<12s} {'差异':<10s}")
+        emit("-" * 80)
         
         for finding in significant_findings:
-            lines.append(
+            emit(
                 f"{finding['county_tag']:<20s} "
                 f"{finding['category']:<20s} "
                 f"{finding['county_ratio']:>6.1f}%      "
@@ -248,12 +378,12 @@ def generate_correlation_report(stats: Dict) -> str:
                 f"{finding['diff']:>+6.1f}%"
             )
     else:
-        lines.append("\n未发现显著性差异（差异>10个百分点）")
+        emit("\n未发现显著性差异（差异>10个百分点）")
     
     # 关键发现
-    lines.append("\n" + "=" * 80)
-    lines.append("四、关键发现与政策启示")
-    lines.append("=" * 80)
+    emit("\n" + "=" * 80)
+    emit("四、关键发现与政策启示")
+    emit("=" * 80)
     
     # 分析每个重点县域标签的特点
     for county_tag in KEY_COUNTY_TAGS:
@@ -262,16 +392,17 @@ def generate_correlation_report(stats: Dict) -> str:
             continue
         
         category_stats = stats['county_tag_to_categories'][county_tag]
+        ratio_row = ratio_table[county_tag]
         
-        lines.append(f"\n【{county_tag}】（{county_count}个县）")
-        lines.append(f"  特点：")
+        emit(f"\n【{county_tag}】（{county_count}个县）")
+        emit(f"  特点：")
         
         # 找出显著高于或低于总体的措施类别
         significant_categories = []
-        for category, count in category_stats.items():
-            ratio = count / county_count * 100
-            overall_count = stats['overall_categories'].get(category, 0)
-            overall_ratio = overall_count / stats['total_counties'] * 100
+        for category in category_stats:
+            county_ratio, overall_ratio, _, _ = ratio_row[category]
+            ratio = county_ratio * 100
+            overall_ratio = overall_ratio * 100
             diff = ratio - overall_ratio
             
             if abs(diff) > 5:  # 差异超过5个百分点
@@ -282,11 +413,11 @@ def generate_correlation_report(stats: Dict) -> str:
         
         if significant_categories:
             for category, ratio, overall_ratio, diff in significant_categories[:5]:  # 只显示前5个
-                lines.append(f"    - {category}: {ratio:.1f}%（总体{overall_ratio:.1f}%，{'显著高于' if diff > 0 else '显著低于'}总体{abs(diff):.1f}个百分点）")
+                emit(f"    - {category}: {ratio:.1f}%（总体{overall_ratio:.1f}%，{'显著高于' if diff > 0 else '显著低于'}总体{abs(diff):.1f}个百分点）")
         else:
-            lines.append(f"    - 措施分布与总体基本一致，无明显差异")
+            emit(f"    - 措施分布与总体基本一致，无明显差异")
     
-    return "\n".join(lines)
+    return buffer.getvalue() if buffer is not None else None
 
 
 def main():
@@ -298,13 +429,12 @@ def main():
     stats = analyze_correlation(all_data)
     
     print("\n📝 正在生成关联分析报告...")
-    report = generate_correlation_report(stats)
     
-    # 保存报告
+    # 报告直接写入文件
     report_file = Path(__file__).parent / "output" / "county_measure_correlation_report.txt"
     report_file.parent.mkdir(parents=True, exist_ok=True)
     with open(report_file, 'w', encoding='utf-8') as f:
-        f.write(report)
+        generate_correlation_report(stats, f)
     
     print(f"✅ 关联分析报告已保存: {report_file}")
     
@@ -312,7 +442,8 @@ def main():
     print("\n" + "=" * 80)
     print("报告摘要")
     print("=" * 80)
-    print(report[:3000])  # 打印前3000字符
+    with open(report_file, 'r', encoding='utf-8') as f:
+        print(f.read(3000))  # 打印前3000字符
     print("\n... (完整报告请查看文件)")
 
 
@@ -4,55 +4,177 @@
 分析所有县的标签，汇总并评估合理性，提出标准化建议
 """
 
+import io
 import json
+import os
+import pickle
+import re
 from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set, TextIO
+
+# 优先使用 orjson（C实现，直接解析字节更快）；未安装时回退到标准库
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# 标签模式分类关键词，按优先级排列：命中多个类别时归入靠前的类别
+_TAG_PATTERN_KEYWORDS = (
+    # 地形关键词
+    ('地形类', ('山', '高原', '平原', '丘陵', '盆地', '河谷', '边境', '沿海')),
+    # 区位关键词
+    ('区位类', ('革命老区', '民族', '边境', '易地搬迁', '生态脆弱')),
+    # 产业关键词
+    ('产业类', ('产业', '农业', '工业', '旅游', '电商', '光伏', '养殖', '种植')),
+    # 政策关键词
+    ('政策类', ('扶贫', '协作', '帮扶', '定点', '示范')),
+)
+
+# 多模式字符串匹配（Aho-Corasick 自动机），可选依赖
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
+# 有 pyahocorasick 时把全部关键词编译成一个多模式匹配自动机，每个标签只需扫描一遍
+if HAS_AHOCORASICK:
+    _TAG_AUTOMATON = ahocorasick.Automaton()
+    for _priority, (_category, _keywords) in enumerate(_TAG_PATTERN_KEYWORDS):
+        for _kw in _keywords:
+            # 同一关键词出现在多个类别时保留优先级高的
+            if _kw not in _TAG_AUTOMATON:
+                _TAG_AUTOMATON.add_word(_kw, _priority)
+    _TAG_AUTOMATON.make_automaton()
+else:
+    _TAG_AUTOMATON = None
+
+# 未安装 pyahocorasick 时的回退：每个类别的关键词预编译成一个正则，由C实现的正则引擎扫描
+_TAG_PATTERN_REGEXES = tuple(
+    (category, re.compile('|'.join(map(re.escape, keywords))))
+    for category, keywords in _TAG_PATTERN_KEYWORDS
+)
 
 OUTPUT_DIR = Path(__file__).parent / "output" / "4_poverty_reduction_summary"
 
+# 已解析标签文件的缓存：{文件名: (mtime_ns, size, data)}
+_CACHE_PATH = OUTPUT_DIR / ".labels_cache.pkl"
 
-def load_all_labels() -> List[Dict]:
-    """加载所有县的标签文件"""
+
+def _load_cache() -> Dict:
+    """读取解析缓存，缓存不存在或已损坏时返回空字典"""
+    try:
+        with open(_CACHE_PATH, 'rb') as f:
+            cache = pickle.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except Exception:
+        return {}
+
+
+def _save_cache(cache: Dict):
+    """写入解析缓存（先写临时文件再替换，避免中断时留下半个文件）"""
+    tmp_path = _CACHE_PATH.with_suffix('.tmp')
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, _CACHE_PATH)
+    except Exception as e:
+        print(f"⚠️  缓存写入失败: {e}")
+
+
+def _load_labels_file(file_path: Path, cached):
+    """
+    读取并解析单个标签文件，返回 (缓存条目, error)。
+    文件未变化时直接使用缓存中的解析结果；
+    异常不在线程内打印，交给主线程按文件顺序统一输出。
+    """
+    try:
+        st = file_path.stat()
+        key = (st.st_mtime_ns, st.st_size)
+        if cached is not None and cached[:2] == key:
+            return cached, None
+        # JSON 规定为 UTF-8，直接按字节读取交给解析器
+        data = _json_loads(file_path.read_bytes())
+        data['_file'] = file_path.name
+        return key + (data,), None
+    except Exception as e:
+        return None, e
+
+
+def load_all_labels(max_workers: int = 16) -> List[Dict]:
+    """
+    加载所有县的标签文件（线程池并行读取，结果保持文件顺序）
+    
+    解析结果按 (文件名, 修改时间, 大小) 缓存到 _CACHE_PATH，
+    再次运行时只重新解析有变化的文件。
+    """
     labels_files = list(OUTPUT_DIR.glob("*_labels.json"))
     results = []
     
-    for file_path in labels_files:
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                data['_file'] = file_path.name
-                results.append(data)
-        except Exception as e:
-            print(f"⚠️  读取失败: {file_path.name} - {e}")
+    old_cache = _load_cache()
+    new_cache = {}
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        loaded = list(executor.map(
+            _load_labels_file,
+            labels_files,
+            [old_cache.get(file_path.name) for file_path in labels_files]
+        ))
+    
+    for file_path, (entry, error) in zip(labels_files, loaded):
+        if error is not None:
+            print(f"⚠️  读取失败: {file_path.name} - {error}")
+            continue
+        new_cache[file_path.name] = entry
+        results.append(entry[2])
+    
+    # 有文件新增、修改或删除时才重写缓存
+    if new_cache.keys() != old_cache.keys() or any(
+            new_cache[name][:2] != old_cache[name][:2] for name in new_cache):
+        _save_cache(new_cache)
     
     return results
 
 
 def extract_all_tags(all_data: List[Dict]) -> Dict[str, Dict]:
     """提取所有标签并统计"""
-    county_tags_counter = Counter()
-    measure_tags_counter = Counter()
+    # 标签先收集成列表，最后一次性交给 Counter（C实现的计数），避免在Python循环里逐个累加
+    county_tag_list = []
+    measure_tag_list = []
     tag_to_counties = defaultdict(set)  # 每个tag出现在哪些县
     measure_tag_to_counties = defaultdict(set)
+    # 循环内只用局部名，省去重复的属性查找；缺省值用空元组，不必每次新建空列表
+    add_county_tags = county_tag_list.extend
+    add_measure_tag = measure_tag_list.append
     
     for data in all_data:
-        county_name = data.get('county_name', '未知')
+        get = data.get
+        county_name = get('county_name', '未知')
         
-        # 统计县域标签
-        county_tags = data.get('county_tags', [])
+        # 县域标签
+        county_tags = get('county_tags', ())
+        add_county_tags(county_tags)
         for tag in county_tags:
-            county_tags_counter[tag] += 1
             tag_to_counties[tag].add(county_name)
         
-        # 统计措施标签
-        effective_measures = data.get('effective_measures', [])
-        for measure in effective_measures:
-            if isinstance(measure, dict):
-                tag = measure.get('tag', '')
-                if tag:
-                    measure_tags_counter[tag] += 1
-                    measure_tag_to_counties[tag].add(county_name)
+        # 措施标签
+        for measure in get('effective_measures', ()):
+            # 正常数据都是带 tag 的字典，直接取值；非字典或缺少 tag 时跳过
+            try:
+                tag = measure['tag']
+            except (TypeError, KeyError):
+                continue
+            if tag:
+                add_measure_tag(tag)
+                measure_tag_to_counties[tag].add(county_name)
+    
+    county_tags_counter = Counter(county_tag_list)
+    measure_tags_counter = Counter(measure_tag_list)
     
     return {
         'county_tags': {
@@ -66,53 +188,43 @@ def extract_all_tags(all_data: List[Dict]) -> Dict[str, Dict]:
     }
 
 
-def analyze_tag_patterns(tags: Counter) -> Dict:
-    """分析标签模式"""
-    patterns = {
-        '地形类': [],
-        '区位类': [],
-        '产业类': [],
-        '政策类': [],
-        '其他': []
-    }
+def _classify_tag(tag: str) -> str:
+    """按关键词判断标签所属的模式类别，都不命中时归入'其他'"""
+    if _TAG_AUTOMATON is not None:
+        best = None
+        for _, priority in _TAG_AUTOMATON.iter(tag):
+            if best is None or priority < best:
+                best = priority
+                if best == 0:
+                    break
+        return _TAG_PATTERN_KEYWORDS[best][0] if best is not None else '其他'
     
-    # 地形关键词
-    terrain_keywords = ['山', '高原', '平原', '丘陵', '盆地', '河谷', '边境', '沿海']
-    # 区位关键词
-    location_keywords = ['革命老区', '民族', '边境', '易地搬迁', '生态脆弱']
-    # 产业关键词
-    industry_keywords = ['产业', '农业', '工业', '旅游', '电商', '光伏', '养殖', '种植']
-    # 政策关键词
-    policy_keywords = ['扶贫', '协作', '帮扶', '定点', '示范']
+    for category, regex in _TAG_PATTERN_REGEXES:
+        if regex.search(tag):
+            return category
+    return '其他'
+
+
+@lru_cache(maxsize=8)
+def _group_tag_items(tag_items: tuple) -> tuple:
+    """
+    把 (tag, count) 按模式类别分组，返回 ((类别, ((tag, count), ...)), ...)
     
-    for tag, count in tags.items():
-        categorized = False
-        
-        # 地形类
-        if any(kw in tag for kw in terrain_keywords):
-            patterns['地形类'].append((tag, count))
-            categorized = True
-        
-        # 区位类
-        if not categorized and any(kw in tag for kw in location_keywords):
-            patterns['区位类'].append((tag, count))
-            categorized = True
-        
-        # 产业类
-        if not categorized and any(kw in tag for kw in industry_keywords):
-            patterns['产业类'].append((tag, count))
-            categorized = True
-        
-        # 政策类
-        if not categorized and any(kw in tag for kw in policy_keywords):
-            patterns['政策类'].append((tag, count))
-            categorized = True
-        
-        # 其他
-        if not categorized:
-            patterns['其他'].append((tag, count))
+    结果按输入缓存：同一批标签再次分析时直接复用，不再逐个分类
+    """
+    patterns = {category: [] for category, _ in _TAG_PATTERN_KEYWORDS}
+    patterns['其他'] = []
     
-    return patterns
+    for tag, count in tag_items:
+        patterns[_classify_tag(tag)].append((tag, count))
+    
+    return tuple((category, tuple(items)) for category, items in patterns.items())
+
+
+def analyze_tag_patterns(tags: Counter) -> Dict:
+    """分析标签模式"""
+    # 缓存键保留标签的原始顺序（同频次标签在报告中按此顺序排列）
+    return {category: list(items) for category, items in _group_tag_items(tuple(tags.items()))}
 
 
 def suggest_standardized_tags(county_tags: Counter, measure_tags: Counter) -> Dict:
@@ -190,107 +302,125 @@ def suggest_standardized_tags(county_tags: Counter, measure_tags: Counter) -> Di
     }
 
 
-def generate_report(all_data: List[Dict], tag_stats: Dict, standardized: Dict) -> str:
-    """生成分析报告"""
-    lines = []
-    lines.append("=" * 80)
-    lines.append("县域标签与措施标签分析报告")
-    lines.append("=" * 80)
-    lines.append(f"\n总县数: {len(all_data)}")
+def standardized_tag_sets(standardized: Dict) -> Dict[str, frozenset]:
+    """把标准化标签体系展开成 {'county_tags': 集合, 'measure_tags': 集合}，供报告和映射表共用"""
+    return {
+        kind: frozenset(chain.from_iterable(standardized[kind].values()))
+        for kind in ('county_tags', 'measure_tags')
+    }
+
+
+def generate_report(all_data: List[Dict], tag_stats: Dict, standardized: Dict,
+                    out: Optional[TextIO] = None,
+                    std_sets: Optional[Dict[str, frozenset]] = None) -> Optional[str]:
+    """
+    生成分析报告
+    
+    给出 out（已打开的文本文件）时直接逐行写入，不在内存中拼出整份报告，返回 None；
+    否则写入内存缓冲区并返回报告字符串。
+    std_sets 为 standardized_tag_sets() 的结果，不传时现场计算
+    """
+    if std_sets is None:
+        std_sets = standardized_tag_sets(standardized)
+    
+    buffer = None
+    if out is None:
+        out = buffer = io.StringIO()
+    write = out.write
+    
+    def emit(line):
+        # 行与行之间以换行分隔，报告末尾不带多余换行
+        write("\n")
+        write(line)
+    
+    write("=" * 80)
+    emit("县域标签与措施标签分析报告")
+    emit("=" * 80)
+    emit(f"\n总县数: {len(all_data)}")
     
     # 县域标签统计
-    lines.append("\n" + "=" * 80)
-    lines.append("一、县域标签统计")
-    lines.append("=" * 80)
+    emit("\n" + "=" * 80)
+    emit("一、县域标签统计")
+    emit("=" * 80)
     county_tags = tag_stats['county_tags']['counter']
-    lines.append(f"\n共发现 {len(county_tags)} 种不同的县域标签")
-    lines.append("\n【标签频次排序（前20）】")
+    emit(f"\n共发现 {len(county_tags)} 种不同的县域标签")
+    emit("\n【标签频次排序（前20）】")
     for tag, count in county_tags.most_common(20):
-        lines.append(f"  {tag:30s} : {count:3d} 个县")
+        emit(f"  {tag:30s} : {count:3d} 个县")
     
     # 措施标签统计
-    lines.append("\n" + "=" * 80)
-    lines.append("二、措施标签统计")
-    lines.append("=" * 80)
+    emit("\n" + "=" * 80)
+    emit("二、措施标签统计")
+    emit("=" * 80)
     measure_tags = tag_stats['measure_tags']['counter']
-    lines.append(f"\n共发现 {len(measure_tags)} 种不同的措施标签")
-    lines.append("\n【标签频次排序（前30）】")
+    emit(f"\n共发现 {len(measure_tags)} 种不同的措施标签")
+    emit("\n【标签频次排序（前30）】")
     for tag, count in measure_tags.most_common(30):
-        lines.append(f"  {tag:30s} : {count:3d} 个县")
+        emit(f"  {tag:30s} : {count:3d} 个县")
     
     # 标签模式分析
-    lines.append("\n" + "=" * 80)
-    lines.append("三、县域标签模式分析")
-    lines.append("=" * 80)
+    emit("\n" + "=" * 80)
+    emit("三、县域标签模式分析")
+    emit("=" * 80)
     county_patterns = analyze_tag_patterns(county_tags)
     for category, tags_list in county_patterns.items():
         if tags_list:
-            lines.append(f"\n【{category}】")
+            emit(f"\n【{category}】")
             for tag, count in sorted(tags_list, key=lambda x: x[1], reverse=True)[:10]:
-                lines.append(f"  {tag:30s} : {count:3d} 个县")
+                emit(f"  {tag:30s} : {count:3d} 个县")
     
-    lines.append("\n" + "=" * 80)
-    lines.append("四、措施标签模式分析")
-    lines.append("=" * 80)
+    emit("\n" + "=" * 80)
+    emit("四、措施标签模式分析")
+    emit("=" * 80)
     measure_patterns = analyze_tag_patterns(measure_tags)
     for category, tags_list in measure_patterns.items():
         if tags_list:
-            lines.append(f"\n【{category}】")
+            emit(f"\n【{category}】")
             for tag, count in sorted(tags_list, key=lambda x: x[1], reverse=True)[:10]:
-                lines.append(f"  {tag:30s} : {count:3d} 个县")
+                emit(f"  {tag:30s} : {count:3d} 个县")
     
     # 标准化建议
-    lines.append("\n" + "=" * 80)
-    lines.append("五、标准化标签体系建议")
-    lines.append("=" * 80)
+    emit("\n" + "=" * 80)
+    emit("五、标准化标签体系建议")
+    emit("=" * 80)
     
-    lines.append("\n【县域标签标准化体系】")
+    emit("\n【县域标签标准化体系】")
     for category, tags in standardized['county_tags'].items():
-        lines.append(f"\n{category}:")
+        emit(f"\n{category}:")
         for tag in tags:
-            lines.append(f"  - {tag}")
+            emit(f"  - {tag}")
     
-    lines.append("\n【措施标签标准化体系】")
+    emit("\n【措施标签标准化体系】")
     for category, tags in standardized['measure_tags'].items():
-        lines.append(f"\n{category}:")
+        emit(f"\n{category}:")
         for tag in tags:
-            lines.append(f"  - {tag}")
+            emit(f"  - {tag}")
     
     # 问题分析
-    lines.append("\n" + "=" * 80)
-    lines.append("六、当前标签体系存在的问题")
-    lines.append("=" * 80)
+    emit("\n" + "=" * 80)
+    emit("六、当前标签体系存在的问题")
+    emit("=" * 80)
     
     # 找出不在标准化体系中的标签
-    all_county_tags_set = set(county_tags.keys())
-    standardized_county_tags = set()
-    for tags in standardized['county_tags'].values():
-        standardized_county_tags.update(tags)
-    
-    unstandardized_county = all_county_tags_set - standardized_county_tags
+    unstandardized_county = county_tags.keys() - std_sets['county_tags']
     if unstandardized_county:
-        lines.append("\n【县域标签中未标准化的标签（需要映射）】")
+        emit("\n【县域标签中未标准化的标签（需要映射）】")
         for tag in sorted(unstandardized_county):
             count = county_tags[tag]
-            lines.append(f"  {tag:30s} : {count:3d} 个县")
+            emit(f"  {tag:30s} : {count:3d} 个县")
     
-    all_measure_tags_set = set(measure_tags.keys())
-    standardized_measure_tags = set()
-    for tags in standardized['measure_tags'].values():
-        standardized_measure_tags.update(tags)
-    
-    unstandardized_measure = all_measure_tags_set - standardized_measure_tags
+    unstandardized_measure = measure_tags.keys() - std_sets['measure_tags']
     if unstandardized_measure:
-        lines.append("\n【措施标签中未标准化的标签（需要映射）】")
+        emit("\n【措施标签中未标准化的标签（需要映射）】")
         for tag in sorted(unstandardized_measure):
             count = measure_tags[tag]
-            lines.append(f"  {tag:30s} : {count:3d} 个县")
+            emit(f"  {tag:30s} : {count:3d} 个县")
     
     # 建议
-    lines.append("\n" + "=" * 80)
-    lines.append("七、改进建议")
-    lines.append("=" * 80)
-    lines.append("""
+    emit("\n" + "=" * 80)
+    emit("七、改进建议")
+    emit("=" * 80)
+    emit("""
 1. 建立标签映射表：将现有不规范的标签映射到标准化标签
 2. 修改提示词：在 county_labeler.py 的 PROMPT_TEMPLATE 中明确指定可用的标签列表
 3. 标签数量限制：
@@ -300,11 +430,109 @@ def generate_report(all_data: List[Dict], tag_stats: Dict, standardized: Dict) -
 5. 建立标签验证机制：处理完成后验证标签是否符合标准
     """)
     
-    return "\n".join(lines)
+    return buffer.getvalue() if buffer is not None else None
+
+
+@lru_cache(maxsize=None)
+def _build_tag_index(std_tags: tuple):
+    """
+    为标准化标签建立模糊匹配索引
+    
+    Returns:
+        (2-gram倒排索引, 不足2字的标准化标签序号)
+        倒排索引的值是标准化标签在 std_tags 中的序号，便于按原顺序取第一个匹配
+    """
+    bigram_index = defaultdict(set)
+    short_ids = []
+    for idx, std_tag in enumerate(std_tags):
+        if len(std_tag) < 2:
+            short_ids.append(idx)
+            continue
+        for i in range(len(std_tag) - 1):
+            bigram_index[std_tag[i:i + 2]].add(idx)
+    
+    return dict(bigram_index), tuple(short_ids)
+
 
+def _match_standard_tag(tag: str, std_tags: tuple, bigram_index: Dict, short_ids: tuple):
+    """
+    按 std_tags 的顺序找到第一个与 tag 互为子串的标准化标签
+    
+    两者互为子串时必然共享至少一个2-gram（双方都不短于2字时），
+    因此只需检查与 tag 有共同2-gram的候选标签。
+    """
+    if len(tag) < 2:
+        candidates = range(len(std_tags))
+    else:
+        candidate_ids = set(short_ids)
+        for i in range(len(tag) - 1):
+            candidate_ids.update(bigram_index.get(tag[i:i + 2], ()))
+        candidates = sorted(candidate_ids)
+    
+    for idx in candidates:
+        std_tag = std_tags[idx]
+        if tag in std_tag or std_tag in tag:
+            return std_tag
+    return None
 
-def save_tag_mapping(tag_stats: Dict, standardized: Dict, output_file: Path):
-    """保存标签映射表（JSON格式）"""
+
+@lru_cache(maxsize=None)
+def _build_std_automaton(std_tags: tuple):
+    """把标准化标签编译成自动机，值为该标签在 std_tags 中首次出现的序号；没有非空标签时返回None"""
+    automaton = ahocorasick.Automaton()
+    for idx, std_tag in enumerate(std_tags):
+        if std_tag and std_tag not in automaton:
+            automaton.add_word(std_tag, idx)
+    if len(automaton) == 0:
+        return None
+    automaton.make_automaton()
+    return automaton
+
+
+def _match_standard_tags_automaton(tags: List[str], std_tags: tuple) -> Dict[str, Optional[str]]:
+    """
+    用 Aho-Corasick 自动机为一批标签找到 std_tags 中第一个与之互为子串的标准化标签
+    
+    结果与逐个调用 _match_standard_tag 相同：
+      - 标准化标签是 tag 的子串：用标准化标签的自动机扫描 tag
+      - tag 是标准化标签的子串：用这批 tag 建自动机，扫描每个标准化标签
+    两个方向取序号较小者。
+    """
+    best = {}
+    
+    # 空串是任何字符串的子串
+    empty_idx = next((idx for idx, std_tag in enumerate(std_tags) if not std_tag), None)
+    
+    std_automaton = _build_std_automaton(std_tags)
+    tag_automaton = ahocorasick.Automaton()
+    for tag in tags:
+        if not tag:
+            if std_tags:
+                best[tag] = 0
+            continue
+        candidates = [] if empty_idx is None else [empty_idx]
+        if std_automaton is not None:
+            candidates.extend(idx for _, idx in std_automaton.iter(tag))
+        if candidates:
+            best[tag] = min(candidates)
+        tag_automaton.add_word(tag, tag)
+    
+    if len(tag_automaton):
+        tag_automaton.make_automaton()
+        for idx, std_tag in enumerate(std_tags):
+            for _, tag in tag_automaton.iter(std_tag):
+                if idx < best.get(tag, idx + 1):
+                    best[tag] = idx
+    
+    return {tag: std_tags[best[tag]] if tag in best else None for tag in tags}
+
+
+def save_tag_mapping(tag_stats: Dict, standardized: Dict, output_file: Path,
+                     std_sets: Optional[Dict[str, frozenset]] = None):
+    """保存标签映射表（JSON格式），std_sets 同 generate_report"""
+    if std_sets is None:
+        std_sets = standardized_tag_sets(standardized)
+    
     mapping = {
         'county_tag_mapping': {},
         'measure_tag_mapping': {},
@@ -312,39 +540,27 @@ def save_tag_mapping(tag_stats: Dict, standardized: Dict, output_file: Path):
         'standardized_measure_tags': standardized['measure_tags']
     }
     
-    # 生成县域标签映射建议（简单映射：相似度匹配）
-    county_tags = tag_stats['county_tags']['counter']
-    standardized_county_tags = []
-    for tags in standardized['county_tags'].values():
-        standardized_county_tags.extend(tags)
-    
-    for tag in county_tags.keys():
-        if tag not in standardized_county_tags:
-            # 找到最相似的标准化标签
-            best_match = None
-            for std_tag in standardized_county_tags:
-                if tag in std_tag or std_tag in tag:
-                    best_match = std_tag
-                    break
-            if best_match:
-                mapping['county_tag_mapping'][tag] = best_match
-    
-    # 生成措施标签映射建议
-    measure_tags = tag_stats['measure_tags']['counter']
-    standardized_measure_tags = []
-    for tags in standardized['measure_tags'].values():
-        standardized_measure_tags.extend(tags)
-    
-    for tag in measure_tags.keys():
-        if tag not in standardized_measure_tags:
-            # 找到最相似的标准化标签
-            best_match = None
-            for std_tag in standardized_measure_tags:
-                if tag in std_tag or std_tag in tag:
-                    best_match = std_tag
-                    break
+    # 生成县域标签映射建议（简单映射：相似度匹配），措施标签同理
+    for kind in ('county', 'measure'):
+        tags_counter = tag_stats[f'{kind}_tags']['counter']
+        std_tags = tuple(tag for tags in standardized[f'{kind}_tags'].values() for tag in tags)
+        std_set = std_sets[f'{kind}_tags']
+        
+        tag_mapping = mapping[f'{kind}_tag_mapping']
+        unmapped = [tag for tag in tags_counter.keys() if tag not in std_set]
+        
+        # 找到最相似的标准化标签：有 pyahocorasick 时整批匹配，否则借助2-gram索引逐个匹配
+        if HAS_AHOCORASICK:
+            matches = _match_standard_tags_automaton(unmapped, std_tags)
+        else:
+            bigram_index, short_ids = _build_tag_index(std_tags)
+            matches = {tag: _match_standard_tag(tag, std_tags, bigram_index, short_ids)
+                       for tag in unmapped}
+        
+        for tag in unmapped:
+            best_match = matches[tag]
             if best_match:
-                mapping['measure_tag_mapping'][tag] = best_match
+                tag_mapping[tag] = best_match
     
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(mapping, f, ensure_ascii=False, indent=2)
@@ -364,27 +580,30 @@ def main():
         tag_stats['measure_tags']['counter']
     )
     
+    # 标准化标签集合只算一次，报告和映射表共用
+    std_sets = standardized_tag_sets(standardized)
+    
     print("\n📝 正在生成分析报告...")
-    report = generate_report(all_data, tag_stats, standardized)
     
-    # 保存报告
+    # 报告直接写入文件
     report_file = Path(__file__).parent / "output" / "tag_analysis_report.txt"
     report_file.parent.mkdir(parents=True, exist_ok=True)
     with open(report_file, 'w', encoding='utf-8') as f:
-        f.write(report)
+        generate_report(all_data, tag_stats, standardized, f, std_sets)
     
     print(f"✅ 分析报告已保存: {report_file}")
     
     # 保存标签映射表
     mapping_file = Path(__file__).parent / "output" / "tag_mapping.json"
-    save_tag_mapping(tag_stats, standardized, mapping_file)
+    save_tag_mapping(tag_stats, standardized, mapping_file, std_sets)
     print(f"✅ 标签映射表已保存: {mapping_file}")
     
     # 打印报告摘要
     print("\n" + "=" * 80)
     print("报告摘要")
     print("=" * 80)
-    print(report[:2000])  # 打印前2000字符
+    with open(report_file, 'r', encoding='utf-8') as f:
+        print(f.read(2000))  # 打印前2000字符
     print("\n... (完整报告请查看文件)")
 
 
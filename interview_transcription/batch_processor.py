@@ -8,17 +8,38 @@
 import os
 import json
 import time
+import queue
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import List, Optional
 
+import requests
+from requests.adapters import HTTPAdapter
+
+# 优先使用 orjson（C实现，解析/序列化更快）；其 JSONDecodeError 是 json.JSONDecodeError 的子类
+try:
+    import orjson
+    _json_loads = orjson.loads
+    
+    def _json_dumps_indent(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    _json_loads = json.loads
+    
+    def _json_dumps_indent(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
 # 导入自定义模块
 import sys
 # 确保能导入Ifasr_llm模块
 sys.path.insert(0, str(Path(__file__).parent))
 
 from config import Config
+from rate_limiter import TokenBucket
 from text_cleaner import TextCleaner
-from zhipu_cleaner import ZhipuTextCleaner
+from zhipu_cleaner import ZhipuTextCleaner, get_zhipu_cleaner
 from poverty_reduction_analyzer import PovertyReductionAnalyzer
 
 # 导入讯飞API模块
@@ -26,14 +47,252 @@ from Ifasr_llm.Ifasr import XfyunAsrClient
 from Ifasr_llm.orderResult import parse_order_result
 
 
+# 子进程内的文本清洗器（进程池中每个进程首次使用时创建）
+_process_text_cleaner = None
+
+
+def _merge_transcript(api_response: dict, parse_dialogues: bool,
+                      text_cleaner: Optional[TextCleaner] = None):
+    """
+    解析转写结果并合并段落（纯计算，可在进程池中执行）
+    
+    Args:
+        api_response: 讯飞转写结果
+        parse_dialogues: 是否同时解析出对话列表（供AI优化）
+        text_cleaner: 使用的清洗器，为None时使用当前进程共用的实例
+        
+    Returns:
+        (merged_text, dialogues)：不解析对话时 dialogues 为None
+    """
+    global _process_text_cleaner
+    if text_cleaner is None:
+        if _process_text_cleaner is None:
+            _process_text_cleaner = TextCleaner()
+        text_cleaner = _process_text_cleaner
+    
+    # 解析转写结果
+    transcript_text = parse_order_result(
+        api_response, 
+        with_speaker=True, 
+        debug=False
+    )
+    
+    if not transcript_text:
+        raise Exception("转写结果为空")
+    
+    merged_text = text_cleaner.clean_transcript(
+        transcript_text,
+        merge_speakers=True,
+        deep_clean=False,
+        use_ai=False
+    )
+    
+    dialogues = text_cleaner.parse_speaker_text(merged_text) if parse_dialogues else None
+    return merged_text, dialogues
+
+
+class _AsrPoller:
+    """
+    讯飞转写结果的统一轮询线程
+    
+    各文件上传音频后通过 add() 交给本线程，由这一个线程每隔 interval 秒
+    依次查询所有未完成的订单，完成或失败时调用对应的回调 callback(result, error)。
+    这样上传完的文件不必各占一个工作线程阻塞等待，同时转写的文件数不受线程数限制。
+    每次查询前从 limiter 取令牌，与上传共用同一个讯飞请求限额；
+    订单登记后超过 max_wait 秒仍未完成则以超时失败结束。
+    """
+    
+    def __init__(self, interval: float, limiter: Optional[TokenBucket] = None,
+                 max_wait: Optional[float] = None):
+        self.interval = interval
+        self.limiter = limiter
+        self.max_wait = max_wait
+        self._pending = []  # [(客户端, 回调, 截止时间)]
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._cancelled = False
+        self._thread = threading.Thread(target=self._run, name="asr-poller", daemon=True)
+        self._thread.start()
+    
+    def add(self, asr_client: XfyunAsrClient, callback):
+        """登记一个已上传音频的客户端"""
+        deadline = None if self.max_wait is None else time.monotonic() + self.max_wait
+        with self._lock:
+            self._pending.append((asr_client, callback, deadline))
+    
+    def close(self, cancel: bool = False):
+        """
+        停止轮询线程
+        
+        Args:
+            cancel: True 时令仍未完成的订单以失败回调结束
+        """
+        self._cancelled = cancel
+        self._stop.set()
+        self._thread.join()
+        if cancel:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            for _, callback, _ in pending:
+                callback(None, RuntimeError("转写轮询已取消"))
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                pending, self._pending = self._pending, []
+            
+            still_pending = []
+            for idx, item in enumerate(pending):
+                if self._stop.is_set():
+                    # 中途被关闭：剩下的留给 close() 处理
+                    still_pending.extend(pending[idx:])
+                    break
+                asr_client, callback, deadline = item
+                if deadline is not None and time.monotonic() >= deadline:
+                    callback(None, Exception(
+                        f"查询超时：等待超过{self.max_wait}秒，订单ID：{asr_client.order_id}"))
+                    continue
+                if self.limiter is not None:
+                    self.limiter.acquire()
+                try:
+                    result = asr_client.query_transcribe_result()
+                except Exception as e:
+                    callback(None, e)
+                    continue
+                if result is None:
+                    still_pending.append(item)
+                else:
+                    callback(result, None)
+            
+            with self._lock:
+                self._pending = still_pending + self._pending
+
+
+class _AiBatchQueue:
+    """
+    跨文件汇总待AI优化的对话，由单独的消费线程攒批后统一提交智谱AI
+    
+    各工作线程完成转写与合并后调用 submit() 放入队列；消费线程累积到
+    TARGET_BATCH 个段落，或自第一个文件入队起等待超过 MAX_WAIT 秒后，
+    把这些文件的对话一起提交清洗，再通过 Future 把结果分发回各文件。
+    """
+    
+    # 攒够多少个段落立即提交
+    TARGET_BATCH = 64
+    # 最长等待时间（秒），避免文件少时一直攒不满
+    MAX_WAIT = 2.0
+    
+    def __init__(self, ai_cleaner: ZhipuTextCleaner, batch_size: int = 5, max_workers: int = 4):
+        self.ai_cleaner = ai_cleaner
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._cancelled = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ai-batcher", daemon=True)
+        self._thread.start()
+    
+    def submit(self, basename: str, dialogues: List[dict]) -> Future:
+        """提交一个文件的对话列表，返回其清洗结果 (清洗后对话列表, 失败批次数) 的 Future"""
+        future = Future()
+        with self._lock:
+            if self._closed:
+                future.set_exception(RuntimeError("AI批处理队列已关闭"))
+            else:
+                self._queue.put((basename, dialogues, future))
+        return future
+    
+    def close(self, cancel: bool = False):
+        """
+        关闭队列并等待消费线程退出
+        
+        Args:
+            cancel: True 时不再提交队列中剩余的文件，直接令其失败
+        """
+        with self._lock:
+            self._closed = True
+            self._cancelled = cancel
+        self._stop.set()
+        self._thread.join()
+    
+    def _run(self):
+        pending = []
+        pending_count = 0
+        deadline = None
+        
+        while True:
+            if deadline is None:
+                timeout = 0.1
+            else:
+                timeout = max(0.0, deadline - time.monotonic())
+            
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            
+            if item is not None:
+                pending.append(item)
+                pending_count += len(item[1])
+                if deadline is None:
+                    deadline = time.monotonic() + self.MAX_WAIT
+            
+            stopping = self._stop.is_set()
+            if pending and (pending_count >= self.TARGET_BATCH
+                            or time.monotonic() >= deadline
+                            or stopping):
+                if stopping and self._cancelled:
+                    for _, _, future in pending:
+                        future.set_exception(RuntimeError("AI批处理已取消"))
+                else:
+                    self._flush(pending, pending_count)
+                pending = []
+                pending_count = 0
+                deadline = None
+            
+            # 关闭后不会再有新文件入队，队列取空即可退出
+            if stopping and item is None and not pending:
+                return
+    
+    def _flush(self, pending: list, pending_count: int):
+        """把攒下的多个文件一起提交清洗，并按文件分发结果"""
+        names = '、'.join(basename for basename, _, _ in pending)
+        print(f"\n🤖 跨文件批量AI优化: {len(pending)}个文件，共{pending_count}个段落（{names}）")
+        try:
+            results = self.ai_cleaner.clean_dialogue_groups(
+                [dialogues for _, dialogues, _ in pending],
+                batch_size=self.batch_size,
+                max_workers=self.max_workers
+            )
+        except Exception as e:
+            for _, _, future in pending:
+                future.set_exception(e)
+            return
+        
+        for (_, _, future), result in zip(pending, results):
+            future.set_result(result)
+
+
 class BatchProcessor:
     """批量处理访谈音频文件"""
     
+    # 支持的音频扩展名（不区分大小写），与 Config.SUPPORTED_FORMATS 保持一致
+    AUDIO_EXTENSIONS = frozenset(ext.lower() for ext in Config.SUPPORTED_FORMATS)
+    # 处理清单每完成多少个文件写盘一次
+    MANIFEST_FLUSH_EVERY = 10
+    # 文本结果分块编码写入时每块的字符数
+    WRITE_CHUNK_CHARS = 1 << 18
+    
     def __init__(self, 
                  input_dir: str,
                  output_base_dir: str = "output",
                  enable_ai: bool = True,
-                 enable_poverty_analysis: bool = True):
+                 enable_poverty_analysis: bool = True,
+                 max_workers: int = 4,
+                 use_cache: bool = True):
         """
         初始化批处理器
         
@@ -42,11 +301,15 @@ class BatchProcessor:
             output_base_dir: 输出基础目录
             enable_ai: 是否启用智谱AI优化
             enable_poverty_analysis: 是否启用减贫措施分析
+            max_workers: 同时处理的文件数（线程数），1 表示逐个处理
+            use_cache: 是否缓存智谱AI的清洗结果（缓存于 输出目录/.zhipu_cache），
+                       重新处理相同文本时不再调用API
         """
         self.input_dir = Path(input_dir)
         self.output_base_dir = Path(output_base_dir)
         self.enable_ai = enable_ai
         self.enable_poverty_analysis = enable_poverty_analysis
+        self.max_workers = max(1, max_workers)
         
         # 创建输出目录结构
         self.api_dir = self.output_base_dir / "1_api_responses"
@@ -62,7 +325,8 @@ class BatchProcessor:
         
         if self.enable_ai:
             try:
-                self.ai_cleaner = ZhipuTextCleaner()
+                cache_dir = str((self.output_base_dir / ".zhipu_cache").resolve()) if use_cache else None
+                self.ai_cleaner = get_zhipu_cleaner(cache_dir)
                 print("✅ 智谱AI优化已初始化")
             except Exception as e:
                 print(f"⚠️  智谱AI初始化失败: {e}")
@@ -76,162 +340,409 @@ class BatchProcessor:
                 print(f"⚠️  减贫措施分析器初始化失败: {e}")
                 self.enable_poverty_analysis = False
         
-        # 统计信息
+        # 统计信息（多线程处理时通过 _count 加锁更新）
         self.stats = {
             'total': 0,
             'success': 0,
             'failed': 0,
             'skipped': 0
         }
+        self._stats_lock = threading.Lock()
+        # 多个文件同时处理时，输出加锁并带上文件名前缀，避免不同文件的日志混在一起
+        self._print_lock = threading.Lock()
+        
+        # 转写请求限流：按 Config.IFLYTEK_QPS 发放令牌，允许积攒至多1秒的请求量
+        self.limiter = TokenBucket(rate=Config.IFLYTEK_QPS,
+                                    capacity=max(1.0, Config.IFLYTEK_QPS))
+        
+        # 讯飞凭据在初始化时读取一次，各文件创建客户端时直接使用
+        self._asr_credentials = {
+            'appid': Config.IFLYTEK_APPID,
+            'access_key_id': Config.IFLYTEK_API_KEY,
+            'access_key_secret': Config.IFLYTEK_API_SECRET,
+        }
+        
+        # 所有文件共用一个HTTP会话，复用到讯飞接口的连接（省去每个文件重新握手）
+        self.http_session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self.http_session.mount('https://', adapter)
+        self.http_session.mount('http://', adapter)
+        
+        # 批量处理开始时各输出目录中已有的文件名 {目录: 文件名集合}，
+        # 用集合查找代替逐个文件 exists()；为None时直接检查文件系统
+        self._existing_outputs = None
+        
+        # 处理清单：{音频文件标识: 已完成的步骤列表}，命中时无需逐个检查输出文件
+        self.manifest_path = self.output_base_dir / "processed.json"
+        self.manifest = self._load_manifest()
+        self._manifest_lock = threading.Lock()
+        self._manifest_pending = 0
+    
+    def _log(self, basename: str, message: str):
+        """输出单个文件的处理日志；并行处理时每行前加 [文件名]"""
+        if self.max_workers == 1:
+            print(message)
+            return
+        # 开头的空行保持原样，前缀加在正文前
+        text = message.lstrip("\n")
+        leading = message[:len(message) - len(text)]
+        with self._print_lock:
+            print(f"{leading}[{basename}] {text}")
+    
+    def _count(self, key: str):
+        """线程安全地累加一项统计"""
+        with self._stats_lock:
+            self.stats[key] += 1
+    
+    def _required_stages(self) -> List[str]:
+        """当前配置下一个文件需要完成的步骤"""
+        stages = ['api', 'merged']
+        if self.enable_ai:
+            stages.append('ai')
+        if self.enable_poverty_analysis:
+            stages.append('poverty')
+        return stages
+    
+    @staticmethod
+    def _manifest_key(audio_path: Path) -> str:
+        """音频文件标识：文件名+大小+修改时间，音频被替换后自然失效"""
+        st = audio_path.stat()
+        return f"{audio_path.name}:{st.st_size}:{st.st_mtime_ns}"
+    
+    def _load_manifest(self) -> dict:
+        """读取处理清单，不存在或已损坏时返回空清单"""
+        try:
+            manifest = json.loads(self.manifest_path.read_text(encoding='utf-8') or "{}")
+            return manifest if isinstance(manifest, dict) else {}
+        except (OSError, ValueError):
+            return {}
+    
+    def _mark_done(self, key: str, stages: List[str]):
+        """记录文件已完成的步骤，每 MANIFEST_FLUSH_EVERY 个文件写盘一次"""
+        with self._manifest_lock:
+            self.manifest[key] = stages
+            self._manifest_pending += 1
+            if self._manifest_pending >= self.MANIFEST_FLUSH_EVERY:
+                self._flush_manifest_locked()
+    
+    def flush_manifest(self):
+        """把尚未写盘的清单记录写入 processed.json"""
+        with self._manifest_lock:
+            if self._manifest_pending:
+                self._flush_manifest_locked()
+    
+    def _flush_manifest_locked(self):
+        # 先写临时文件再替换，避免中断时留下半个清单
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.manifest_path)
+            self._manifest_pending = 0
+        except OSError as e:
+            print(f"⚠️  处理清单保存失败: {e}")
+    
+    @staticmethod
+    def _write_bytes(path: Path, data: bytes):
+        """把预先编码好的内容一次性写入文件"""
+        with open(path, 'wb') as f:
+            f.write(data)
+    
+    def _write_text_output(self, path: Path, audio_name: str, text: str):
+        """
+        写入带文件头（音频文件名、处理时间）的文本结果
+        
+        文件头和正文分开写，正文按 WRITE_CHUNK_CHARS 分块编码，
+        长转写稿不再额外生成拼接后的整份字符串和整份编码副本
+        """
+        header = (
+            f"音频文件: {audio_name}\n"
+            f"处理时间: {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+            + "=" * 60 + "\n\n"
+        )
+        chunk = self.WRITE_CHUNK_CHARS
+        with open(path, 'wb', buffering=1 << 20) as f:
+            f.write(header.encode('utf-8'))
+            for i in range(0, len(text), chunk):
+                f.write(text[i:i + chunk].encode('utf-8'))
+    
+    def _list_existing_outputs(self) -> dict:
+        """一次性列出各输出目录中已有的文件名"""
+        existing = {}
+        for dir_path in (self.api_dir, self.merged_dir, self.ai_dir, self.poverty_dir):
+            with os.scandir(dir_path) as it:
+                existing[dir_path] = frozenset(entry.name for entry in it)
+        return existing
+    
+    def _outputs_exist(self, api_file: Path, merged_file: Path,
+                       ai_file: Path, poverty_file: Path) -> bool:
+        """当前配置下该文件需要的输出是否都已存在"""
+        required = [api_file, merged_file]
+        if self.enable_ai:
+            required.append(ai_file)
+        if self.enable_poverty_analysis:
+            required.append(poverty_file)
+        
+        existing = self._existing_outputs
+        if existing is not None:
+            return all(path.name in existing[path.parent] for path in required)
+        return all(path.exists() for path in required)
     
     def get_audio_files(self) -> List[Path]:
         """获取所有音频文件"""
-        audio_files = []
-        for ext in ['.mp3', '.MP3', '.wav', '.WAV', '.m4a', '.M4A']:
-            audio_files.extend(self.input_dir.glob(f"*{ext}"))
+        # 一次遍历目录，按小写扩展名筛选
+        with os.scandir(self.input_dir) as it:
+            audio_files = [
+                Path(entry.path) for entry in it
+                if os.path.splitext(entry.name)[1].lower() in self.AUDIO_EXTENSIONS
+                and entry.is_file()
+            ]
         
         # 按文件名排序
         audio_files.sort(key=lambda x: x.name)
         return audio_files
     
-    def process_single_file(self, audio_path: Path) -> bool:
+    def process_single_file(self, audio_path: Path,
+                            ai_batcher: Optional[_AiBatchQueue] = None) -> bool:
         """
         处理单个音频文件
         
         Args:
             audio_path: 音频文件路径
+            ai_batcher: 跨文件AI批处理队列，为None时本文件单独调用智谱AI
             
         Returns:
             是否处理成功
         """
-        basename = audio_path.stem  # 文件名（不含扩展名）
-        print("\n" + "="*70)
-        print(f"📄 处理文件: {audio_path.name}")
-        print("="*70)
-        
         try:
-            # 检查是否已处理过
-            api_file = self.api_dir / f"{basename}_api.json"
-            merged_file = self.merged_dir / f"{basename}_merged.txt"
-            ai_file = self.ai_dir / f"{basename}_ai.txt"
-            poverty_file = self.poverty_dir / f"{basename}_poverty_summary.txt"
-            
-            # 如果所有输出文件都存在，跳过
-            all_done = api_file.exists() and merged_file.exists()
-            if self.enable_ai:
-                all_done = all_done and ai_file.exists()
-            if self.enable_poverty_analysis:
-                all_done = all_done and poverty_file.exists()
-            
-            if all_done:
-                print(f"⏭️  文件已处理，跳过: {audio_path.name}")
-                self.stats['skipped'] += 1
+            job = self._prepare_file(audio_path)
+            if job is None:
                 return True
             
-            # ========== 步骤1: 讯飞语音转写 ==========
-            total_steps = 2 + (1 if self.enable_ai else 0) + (1 if self.enable_poverty_analysis else 0)
-            print(f"\n[1/{total_steps}] 🎙️  讯飞语音转写中...")
+            api_response = self._load_saved_response(job)
+            if api_response is not None:
+                self._finish_file(job, None, api_response, ai_batcher)
+                return True
             
-            asr_client = XfyunAsrClient(
-                appid=Config.IFLYTEK_APPID,
-                access_key_id=Config.IFLYTEK_API_KEY,
-                access_key_secret=Config.IFLYTEK_API_SECRET,
-                audio_file_path=str(audio_path)
-            )
+            asr_client = self._start_transcription(job)
             
-            # 获取转写结果
+            # 获取转写结果（在当前线程内轮询直到完成）
             api_response = asr_client.get_transcribe_result()
             
-            # 保存API原始响应
-            with open(api_file, 'w', encoding='utf-8') as f:
-                json.dump(api_response, f, ensure_ascii=False, indent=2)
-            print(f"   ✅ API响应已保存: {api_file.name}")
-            
-            # 解析转写结果
-            transcript_text = parse_order_result(
-                api_response, 
-                with_speaker=True, 
-                debug=False
-            )
-            
-            if not transcript_text:
-                raise Exception("转写结果为空")
-            
-            # ========== 步骤2: 合并段落 ==========
-            step_num = 2
-            print(f"\n[{step_num}/{total_steps}] 📝 合并连续同一说话人段落...")
+            self._finish_file(job, asr_client, api_response, ai_batcher)
+            return True
             
-            merged_text = self.text_cleaner.clean_transcript(
-                transcript_text,
-                merge_speakers=True,
-                deep_clean=False,
-                use_ai=False
+        except Exception as e:
+            self._report_failure(audio_path, e)
+            return False
+    
+    def _prepare_file(self, audio_path: Path) -> Optional[dict]:
+        """
+        开始处理一个文件：打印标题并检查是否已处理过
+        
+        Returns:
+            已处理过（计为跳过）时返回None，否则返回后续步骤共用的任务信息
+        """
+        basename = audio_path.stem  # 文件名（不含扩展名）
+        self._log(basename, "\n" + "="*70)
+        self._log(basename, f"📄 处理文件: {audio_path.name}")
+        self._log(basename, "="*70)
+        
+        job = {
+            'audio_path': audio_path,
+            'basename': basename,
+            'api_file': self.api_dir / f"{basename}_api.json",
+            'merged_file': self.merged_dir / f"{basename}_merged.txt",
+            'ai_file': self.ai_dir / f"{basename}_ai.txt",
+            'poverty_file': self.poverty_dir / f"{basename}_poverty_summary.txt",
+            'total_steps': 2 + (1 if self.enable_ai else 0) + (1 if self.enable_poverty_analysis else 0),
+        }
+        
+        # 检查是否已处理过：先查处理清单，清单中没有记录时再检查输出文件
+        # （删除 processed.json 即可强制重新检查所有文件）；清单中有记录但步骤不全
+        # （如AI优化部分失败）时不再看输出文件，直接重新处理
+        job['manifest_key'] = manifest_key = self._manifest_key(audio_path)
+        job['required_stages'] = required_stages = self._required_stages()
+        done_stages = self.manifest.get(manifest_key, ())
+        all_done = all(stage in done_stages for stage in required_stages)
+        
+        # 如果所有输出文件都存在，跳过
+        if (not all_done and manifest_key not in self.manifest
+                and self._outputs_exist(job['api_file'], job['merged_file'],
+                                        job['ai_file'], job['poverty_file'])):
+            all_done = True
+            self._mark_done(manifest_key, required_stages)
+        
+        if all_done:
+            self._log(basename, f"⏭️  文件已处理，跳过: {audio_path.name}")
+            self._count('skipped')
+            return None
+        
+        return job
+    
+    def _load_saved_response(self, job: dict) -> Optional[dict]:
+        """
+        读取之前保存的API响应（如上次处理在后续步骤中断）
+        
+        Returns:
+            可复用时返回解析后的响应，此时无需重新转写；不存在或已损坏时返回None
+        """
+        api_file = job['api_file']
+        existing = self._existing_outputs
+        if existing is not None and api_file.name not in existing[api_file.parent]:
+            return None
+        try:
+            with open(api_file, 'rb') as f:
+                api_response = _json_loads(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self._log(job['basename'], f"   ⚠️  已保存的API响应无法读取，重新转写: {e}")
+            return None
+        if not isinstance(api_response, dict):
+            return None
+        
+        self._log(job['basename'], f"\n[1/{job['total_steps']}] ♻️  复用已保存的API响应: {api_file.name}")
+        return api_response
+    
+    def _start_transcription(self, job: dict) -> XfyunAsrClient:
+        """步骤1前半：创建讯飞客户端并上传音频，返回已拿到订单ID的客户端"""
+        self._log(job['basename'], f"\n[1/{job['total_steps']}] 🎙️  讯飞语音转写中...")
+        
+        self.limiter.acquire()
+        asr_client = XfyunAsrClient(
+            **self._asr_credentials,
+            audio_file_path=str(job['audio_path']),
+            session=self.http_session
+        )
+        asr_client.upload_audio()
+        return asr_client
+    
+    def _finish_file(self, job: dict, asr_client: Optional[XfyunAsrClient], api_response: dict,
+                     ai_batcher: Optional[_AiBatchQueue] = None):
+        """
+        拿到转写结果后的其余步骤：保存响应、合并段落、AI优化、减贫措施分析
+        
+        asr_client 为None表示 api_response 读自已保存的文件，不再重复写入
+        """
+        merged_text, dialogues = self._merge_stage(job, asr_client, api_response)
+        
+        ai_dialogues = None
+        ai_failed = 0
+        if dialogues is not None:
+            if ai_batcher is None:
+                ai_dialogues, ai_failed = self.ai_cleaner.clean_dialogue_groups(
+                    [dialogues],
+                    batch_size=5,
+                    max_workers=1
+                )[0]
+            else:
+                # 与其他文件的段落一起攒批提交，等待取回本文件的结果
+                ai_dialogues, ai_failed = ai_batcher.submit(job['basename'], dialogues).result()
+        
+        self._analysis_stage(job, merged_text, ai_dialogues, ai_failed)
+    
+    def _merge_stage(self, job: dict, asr_client: Optional[XfyunAsrClient],
+                     api_response: dict):
+        """
+        步骤1收尾和步骤2：保存API响应、解析转写结果、合并段落
+        
+        Returns:
+            (merged_text, dialogues)：dialogues 为待AI优化的对话列表，未启用AI时为None
+        """
+        self._save_response(job, asr_client, api_response)
+        merged_text, dialogues = _merge_transcript(api_response, self.enable_ai, self.text_cleaner)
+        self._save_merged(job, merged_text)
+        return merged_text, dialogues
+    
+    def _save_response(self, job: dict, asr_client: Optional[XfyunAsrClient],
+                       api_response: dict):
+        """保存API原始响应，并开始步骤2"""
+        basename = job['basename']
+        api_file = job['api_file']
+        
+        # 保存API原始响应：直接写入接口返回的字节，不再把解析后的字典重新序列化
+        if asr_client is not None:
+            raw_response = asr_client.result_bytes
+            if raw_response is None:
+                raw_response = _json_dumps_indent(api_response)
+            self._write_bytes(api_file, raw_response)
+            self._log(basename, f"   ✅ API响应已保存: {api_file.name}")
+        
+        # ========== 步骤2: 合并段落 ==========
+        self._log(basename, f"\n[2/{job['total_steps']}] 📝 合并连续同一说话人段落...")
+    
+    def _save_merged(self, job: dict, merged_text: str):
+        """保存合并后的文本，启用AI时开始步骤3"""
+        basename = job['basename']
+        merged_file = job['merged_file']
+        
+        # 保存合并后的文本
+        self._write_text_output(merged_file, job['audio_path'].name, merged_text)
+        self._log(basename, f"   ✅ 合并文本已保存: {merged_file.name}")
+        
+        # ========== 步骤3: 智谱AI优化（可选）==========
+        if self.enable_ai:
+            self._log(basename, f"\n[3/{job['total_steps']}] 🤖 智谱AI智能优化中...")
+    
+    def _analysis_stage(self, job: dict, merged_text: str,
+                        ai_dialogues: Optional[List[dict]], ai_failed: int = 0):
+        """
+        步骤3收尾和步骤4：保存AI优化文本、减贫措施分析，并记为处理完成
+        
+        ai_failed 为AI优化失败（保留原文）的批次数，大于0时不记录 'ai' 步骤，
+        下次运行会重新优化该文件
+        """
+        audio_path = job['audio_path']
+        basename = job['basename']
+        ai_file = job['ai_file']
+        poverty_file = job['poverty_file']
+        
+        ai_text = None
+        if ai_dialogues is not None:
+            # 格式化输出
+            ai_text = self.text_cleaner.format_to_text(
+                ai_dialogues,
+                show_speaker=True
             )
             
-            # 保存合并后的文本
-            with open(merged_file, 'w', encoding='utf-8') as f:
-                f.write(f"音频文件: {audio_path.name}\n")
-                f.write(f"处理时间: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write("="*60 + "\n\n")
-                f.write(merged_text)
-            print(f"   ✅ 合并文本已保存: {merged_file.name}")
-            
-            # ========== 步骤3: 智谱AI优化（可选）==========
-            ai_text = None
-            if self.enable_ai:
-                step_num += 1
-                print(f"\n[{step_num}/{total_steps}] 🤖 智谱AI智能优化中...")
-                
-                # 解析为对话列表
-                dialogues = self.text_cleaner.parse_speaker_text(merged_text)
-                
-                # AI优化
-                ai_dialogues = self.ai_cleaner.clean_dialogue_batch(
-                    dialogues,
-                    batch_size=5
-                )
-                
-                # 格式化输出
-                ai_text = self.text_cleaner.format_to_text(
-                    ai_dialogues,
-                    show_speaker=True
-                )
-                
-                # 保存AI优化文本
-                with open(ai_file, 'w', encoding='utf-8') as f:
-                    f.write(f"音频文件: {audio_path.name}\n")
-                    f.write(f"处理时间: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-                    f.write("="*60 + "\n\n")
-                    f.write(ai_text)
-                print(f"   ✅ AI优化文本已保存: {ai_file.name}")
+            # 保存AI优化文本
+            self._write_text_output(ai_file, audio_path.name, ai_text)
+            self._log(basename, f"   ✅ AI优化文本已保存: {ai_file.name}")
+        
+        # ========== 步骤4: 减贫措施分析（可选）==========
+        if self.enable_poverty_analysis:
+            # 减贫措施分析总是最后一步
+            self._log(basename, f"\n[{job['total_steps']}/{job['total_steps']}] 🔍 分析减贫措施中...")
             
-            # ========== 步骤4: 减贫措施分析（可选）==========
-            if self.enable_poverty_analysis:
-                step_num += 1
-                print(f"\n[{step_num}/{total_steps}] 🔍 分析减贫措施中...")
-                
-                # 使用AI优化后的文本（如果有），否则使用合并后的文本
-                analysis_text = ai_text if ai_text else merged_text
-                
-                # 执行分析
-                analysis_result = self.poverty_analyzer.analyze_interview(analysis_text)
-                
-                # 保存分析结果
-                self.poverty_analyzer.save_analysis(
-                    analysis_result,
-                    str(poverty_file),
-                    audio_path.name
-                )
+            # 使用AI优化后的文本（如果有），否则使用合并后的文本
+            analysis_text = ai_text if ai_text else merged_text
             
-            print(f"\n✅ 文件处理完成: {audio_path.name}")
-            self.stats['success'] += 1
-            return True
+            # 执行分析
+            analysis_result = self.poverty_analyzer.analyze_interview(analysis_text)
             
-        except Exception as e:
-            print(f"\n❌ 处理失败: {audio_path.name}")
-            print(f"   错误信息: {str(e)}")
-            self.stats['failed'] += 1
-            return False
+            # 保存分析结果
+            self.poverty_analyzer.save_analysis(
+                analysis_result,
+                str(poverty_file),
+                audio_path.name
+            )
+        
+        done_stages = job['required_stages']
+        if ai_failed:
+            self._log(basename, f"   ⚠️  {ai_failed} 个批次AI优化失败，已保留原文，下次运行时重新优化")
+            done_stages = [stage for stage in done_stages if stage != 'ai']
+        
+        self._log(basename, f"\n✅ 文件处理完成: {audio_path.name}")
+        self._mark_done(job['manifest_key'], done_stages)
+        self._count('success')
+    
+    def _report_failure(self, audio_path: Path, error: Exception):
+        """输出失败信息并计入失败数"""
+        basename = audio_path.stem
+        self._log(basename, f"\n❌ 处理失败: {audio_path.name}")
+        self._log(basename, f"   错误信息: {str(error)}")
+        self._count('failed')
     
     def process_all(self):
         """批量处理所有音频文件"""
@@ -250,20 +761,155 @@ class BatchProcessor:
         print(f"音频文件数: {self.stats['total']}")
         print(f"启用AI优化: {'是' if self.enable_ai else '否'}")
         print(f"启用减贫分析: {'是' if self.enable_poverty_analysis else '否'}")
+        print(f"并行文件数: {self.max_workers}")
         print("="*70)
         
-        # 逐个处理
-        for idx, audio_file in enumerate(audio_files, 1):
-            print(f"\n进度: {idx}/{self.stats['total']}")
-            self.process_single_file(audio_file)
-            
-            # 避免API请求过快
-            if idx < self.stats['total']:
-                time.sleep(2)
+        # 本次运行只会新增输出文件，开始时列一次目录即可判断哪些文件已处理过
+        self._existing_outputs = self._list_existing_outputs()
+        
+        try:
+            if self.max_workers == 1:
+                # 逐个处理
+                for idx, audio_file in enumerate(audio_files, 1):
+                    print(f"\n进度: {idx}/{self.stats['total']}")
+                    self.process_single_file(audio_file)
+            else:
+                # 多个文件同时处理：各文件主要耗时在等待讯飞/智谱接口，线程即可重叠这些等待
+                self._process_parallel(audio_files)
+        finally:
+            # 中断时也保存已完成文件的记录
+            self.flush_manifest()
+            self.http_session.close()
+            self._existing_outputs = None
         
         # 打印最终统计
         self.print_summary()
     
+    def _process_parallel(self, audio_files: List[Path]):
+        """
+        按流水线同时处理多个文件，按完成顺序打印进度
+        
+        各阶段之间用回调衔接，不在线程中等待上一阶段：
+        上传线程池为各文件上传音频 → 一个轮询线程统一查询转写结果 →
+        上传线程池保存响应 → 进程池解析转写结果、合并段落 → 上传线程池保存合并文本 →
+        跨文件批处理队列统一提交智谱AI → 分析线程池保存AI文本、分析减贫措施。
+        等待转写和AI结果时不占用任何工作线程，后续文件的上传不必排在前面文件的分析之后；
+        合并段落是纯Python的文本处理，放在进程池中才能同时用上多个CPU核心。
+        """
+        ai_batcher = _AiBatchQueue(self.ai_cleaner, batch_size=5,
+                                   max_workers=self.max_workers) if self.enable_ai else None
+        poller = _AsrPoller(interval=Config.POLL_INTERVAL, limiter=self.limiter,
+                            max_wait=Config.MAX_POLL_TIME)
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        analysis_executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        # 此时轮询、AI批处理等线程已在运行，fork 出的子进程可能继承被占用的锁而卡死，
+        # 因此用 spawn 方式启动全新的子进程
+        merge_processes = ProcessPoolExecutor(
+            max_workers=max(1, min(self.max_workers, os.cpu_count() or 1)),
+            mp_context=multiprocessing.get_context("spawn"))
+        
+        def fail(audio_path, done, error):
+            self._report_failure(audio_path, error)
+            done.set_result(False)
+        
+        def submit(pool, fn, job, done, *args):
+            try:
+                pool.submit(fn, job, done, *args)
+            except RuntimeError as e:
+                # 线程池已关闭（用户中断）
+                fail(job['audio_path'], done, e)
+        
+        def start(audio_path, done):
+            try:
+                job = self._prepare_file(audio_path)
+                if job is None:
+                    done.set_result(True)
+                    return
+                api_response = self._load_saved_response(job)
+                if api_response is not None:
+                    # 已有转写结果，直接在当前线程进入合并阶段
+                    merge(job, done, None, api_response)
+                    return
+                asr_client = self._start_transcription(job)
+            except Exception as e:
+                fail(audio_path, done, e)
+                return
+            
+            def on_transcribed(result, error):
+                # 在轮询线程中调用：把合并阶段交回上传线程池
+                if error is not None:
+                    fail(job['audio_path'], done, error)
+                else:
+                    submit(executor, merge, job, done, asr_client, result)
+            
+            poller.add(asr_client, on_transcribed)
+        
+        def merge(job, done, asr_client, api_response):
+            try:
+                self._save_response(job, asr_client, api_response)
+                merge_future = merge_processes.submit(_merge_transcript, api_response, self.enable_ai)
+            except Exception as e:
+                fail(job['audio_path'], done, e)
+                return
+            # 在进程池的结果线程中调用：写文件交回上传线程池
+            merge_future.add_done_callback(
+                lambda f: submit(executor, merged, job, done, f))
+        
+        def merged(job, done, merge_future):
+            try:
+                merged_text, dialogues = merge_future.result()
+                self._save_merged(job, merged_text)
+            except Exception as e:
+                fail(job['audio_path'], done, e)
+                return
+            if dialogues is None:
+                submit(analysis_executor, analyze, job, done, merged_text, None)
+                return
+            
+            def on_cleaned(ai_future):
+                # 在AI批处理线程中调用：其余步骤交给分析线程池
+                try:
+                    ai_dialogues, ai_failed = ai_future.result()
+                except Exception as e:
+                    fail(job['audio_path'], done, e)
+                    return
+                submit(analysis_executor, analyze, job, done, merged_text, ai_dialogues, ai_failed)
+            
+            ai_batcher.submit(job['basename'], dialogues).add_done_callback(on_cleaned)
+        
+        def analyze(job, done, merged_text, ai_dialogues, ai_failed=0):
+            try:
+                self._analysis_stage(job, merged_text, ai_dialogues, ai_failed)
+                done.set_result(True)
+            except Exception as e:
+                fail(job['audio_path'], done, e)
+        
+        try:
+            futures = {}
+            for audio_file in audio_files:
+                done = Future()
+                futures[done] = audio_file
+                executor.submit(start, audio_file, done)
+            for idx, future in enumerate(as_completed(futures), 1):
+                future.result()
+                with self._print_lock:
+                    print(f"\n进度: {idx}/{self.stats['total']}（已完成: {futures[future].name}）")
+        except KeyboardInterrupt:
+            # 取消尚未开始的步骤；已在处理中的步骤无法中断，会在后台继续完成
+            executor.shutdown(wait=False, cancel_futures=True)
+            merge_processes.shutdown(wait=False, cancel_futures=True)
+            analysis_executor.shutdown(wait=False, cancel_futures=True)
+            poller.close(cancel=True)
+            if ai_batcher is not None:
+                ai_batcher.close(cancel=True)
+            raise
+        poller.close()
+        executor.shutdown()
+        merge_processes.shutdown()
+        if ai_batcher is not None:
+            ai_batcher.close()
+        analysis_executor.shutdown()
+    
     def print_summary(self):
         """打印处理统计摘要"""
         print("\n" + "="*70)
@@ -301,6 +947,12 @@ def main():
   
   # 指定输出目录
   python batch_processor.py -i mp3data -o my_output --ai
+  
+  # 同时处理8个文件（默认4个，设为1则逐个处理）
+  python batch_processor.py -i mp3data --workers 8
+  
+  # 不使用AI清洗缓存，所有文本重新调用智谱AI
+  python batch_processor.py -i mp3data --no-cache
         """
     )
     
@@ -337,6 +989,18 @@ def main():
         action='store_true',
         help='禁用减贫措施分析'
     )
+    parser.add_argument(
+        '--workers', '--max-workers',
+        dest='workers',
+        type=int,
+        default=4,
+        help='同时处理的文件数（默认: 4，设为1则逐个处理）'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='不使用智谱AI清洗结果缓存（默认缓存于 输出目录/.zhipu_cache）'
+    )
     
     args = parser.parse_args()
     
@@ -351,7 +1015,9 @@ def main():
         input_dir=args.input,
         output_base_dir=args.output,
         enable_ai=enable_ai,
-        enable_poverty_analysis=enable_poverty_analysis
+        enable_poverty_analysis=enable_poverty_analysis,
+        max_workers=args.workers,
+        use_cache=not args.no_cache
     )
     
     try:
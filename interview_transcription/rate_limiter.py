@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+请求限流工具
+讯飞转写与智谱AI的请求共用同一种令牌桶限流器
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    令牌桶限流器：以 rate 个/秒的速度补充令牌，最多积攒 capacity 个
+    
+    令牌不足时 acquire() 预支一个令牌并休眠到它补充出来为止，
+    多个线程同时等待时按取令牌的先后依次放行；rate <= 0 表示不限流。
+    """
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """取一个令牌，必要时阻塞等待"""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # 令牌可以欠为负数，欠得越多等得越久
+            self._tokens -= 1
+            wait = -self._tokens / self.rate
+        if wait > 0:
+            time.sleep(wait)
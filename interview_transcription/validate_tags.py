@@ -8,6 +8,13 @@ import json
 from pathlib import Path
 from typing import Dict, List, Set
 
+# 优先使用 orjson（C实现，直接解析字节更快）；未安装时回退到标准库
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 OUTPUT_DIR = Path(__file__).parent / "output" / "4_poverty_reduction_summary"
 
 # 标准化的县域标签
@@ -127,8 +134,8 @@ def validate_measure_tags(measures: List[Dict]) -> Dict[str, any]:
 def validate_file(file_path: Path) -> Dict[str, any]:
     """验证单个文件"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        # JSON 规定为 UTF-8，直接按字节读取交给解析器
+        data = _json_loads(file_path.read_bytes())
         
         county_name = data.get("county_name", "未知")
         county_tags = data.get("county_tags", [])
@@ -5,10 +5,17 @@
 使用智谱AI的大语言模型进行访谈文本的智能优化
 """
 
+import hashlib
 import json
+import os
+import threading
 import time
-from typing import List, Dict, Optional
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
 from config import Config
+from rate_limiter import TokenBucket
 
 try:
     from zhipuai import ZhipuAI
@@ -17,24 +24,173 @@ except ImportError:
     ZHIPU_AVAILABLE = False
     print("⚠️  提示：未安装zhipuai库，请运行: pip install zhipuai")
 
+# 所有清洗器、所有线程共用的请求限流：按 Config.ZHIPU_QPS 发放令牌，
+# 并发清洗时总请求速率也不超过接口限制
+_limiter = TokenBucket(rate=Config.ZHIPU_QPS, capacity=max(1.0, Config.ZHIPU_QPS))
+
+
+@lru_cache(maxsize=None)
+def _get_client(api_key: str) -> "ZhipuAI":
+    """
+    同一API密钥共用一个智谱AI客户端
+    
+    客户端内部维护HTTP连接池，共用后各清洗器的请求复用已建立的连接，
+    不再各自握手
+    """
+    return ZhipuAI(api_key=api_key)
+
 
 class ZhipuTextCleaner:
     """基于智谱AI的智能文本清洗器"""
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, cache_dir: Optional[str] = None):
         """
         初始化智谱AI客户端
         
         Args:
             api_key: 智谱AI API密钥，默认从Config读取
+            cache_dir: 缓存目录；相同模型和提示词的请求、清洗过的相同段落
+                       直接复用缓存结果，为None时不缓存
         """
         if not ZHIPU_AVAILABLE:
             raise ImportError("未安装zhipuai库，请运行: pip install zhipuai")
         
         self.api_key = api_key or Config.ZHIPU_API_KEY
         self.model = Config.ZHIPU_MODEL
-        self.client = ZhipuAI(api_key=self.api_key)
+        self.client = _get_client(self.api_key)
+        
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        
+        # 段落级缓存 {段落哈希: 清洗后的段落}：跨文件重复的开场白、结束语等
+        # 只清洗一次；仅在启用缓存时生效，持久化于 cache_dir/turns.json
+        self._turn_cache = None
+        self._turn_cache_dirty = False
+        # 段落哈希包含提示词摘要：修改提示词后，旧提示词下的清洗结果不再命中
+        self._prompt_digest = hashlib.sha256(
+            (self._build_system_prompt() + '\0' + self._build_user_prompt('')).encode('utf-8')
+        ).hexdigest()
+        self._turn_lock = threading.Lock()
+        if self.cache_dir is not None:
+            self._turn_cache_path = self.cache_dir / "turns.json"
+            self._turn_cache = self._load_turn_cache()
+    
+    def _cache_path(self, system_prompt: str, user_prompt: str,
+                    temperature: float) -> Path:
+        """按 (模型, 提示词, 温度) 的 SHA-256 计算缓存文件路径"""
+        payload = json.dumps({
+            'model': self.model,
+            'system': system_prompt,
+            'user': user_prompt,
+            'temperature': temperature,
+        }, sort_keys=True, ensure_ascii=False)
+        key = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{key}.txt"
+    
+    @staticmethod
+    def _read_cache(cache_path: Path) -> Optional[str]:
+        """读取缓存的清洗结果，不存在时返回None"""
+        try:
+            return cache_path.read_text(encoding='utf-8')
+        except OSError:
+            return None
+    
+    @staticmethod
+    def _write_cache(cache_path: Path, text: str):
+        """写入缓存：先写临时文件再替换，多线程同时写同一键也不会读到半截内容"""
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            tmp_path.write_text(text, encoding='utf-8')
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"⚠️  写入AI缓存失败: {e}")
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+        
+    def _load_turn_cache(self) -> Dict[str, Dict]:
+        """读取段落缓存，不存在或损坏时返回空缓存"""
+        cached = self._read_cache(self._turn_cache_path)
+        if cached is None:
+            return {}
+        try:
+            turn_cache = json.loads(cached)
+        except json.JSONDecodeError:
+            print(f"⚠️  段落缓存已损坏，将重新建立: {self._turn_cache_path}")
+            return {}
+        return turn_cache if isinstance(turn_cache, dict) else {}
+    
+    def _save_turn_cache(self):
+        """段落缓存有新增时写盘"""
+        if self._turn_cache is None:
+            return
+        with self._turn_lock:
+            if not self._turn_cache_dirty:
+                return
+            payload = json.dumps(self._turn_cache, ensure_ascii=False)
+            self._turn_cache_dirty = False
+        self._write_cache(self._turn_cache_path, payload)
+    
+    def _turn_key(self, item: Dict) -> str:
+        """段落哈希：同一模型、同一提示词下说话人和内容都相同的段落共用清洗结果"""
+        raw = f"{self.model}\n{self._prompt_digest}\n{item['speaker']}\n{item['text']}".encode('utf-8')
+        return hashlib.blake2b(raw, digest_size=16).hexdigest()
+    
+    def _plan_batches(self, dialogues: List[Dict], batch_size: int):
+        """
+        按段落缓存拆分对话列表
         
+        Returns:
+            (cached, spans): cached[i] 为第 i 段的缓存结果（未命中为None）；
+            spans 为需要调用API的 [起, 止) 区间，由连续未命中的段落按 batch_size 切分。
+            没有命中时与直接按 batch_size 切分完全相同。
+        """
+        total = len(dialogues)
+        if self._turn_cache is None:
+            cached = [None] * total
+        else:
+            with self._turn_lock:
+                cached = [self._turn_cache.get(self._turn_key(item)) for item in dialogues]
+        
+        spans = []
+        i = 0
+        while i < total:
+            if cached[i] is not None:
+                i += 1
+                continue
+            end = i
+            while end < total and end - i < batch_size and cached[end] is None:
+                end += 1
+            spans.append((i, end))
+            i = end
+        return cached, spans
+    
+    def _remember_turns(self, batch: List[Dict], cleaned: List[Dict]):
+        """清洗结果与原段落一一对应（段数、说话人均一致）时按段落记入缓存"""
+        if self._turn_cache is None or len(batch) != len(cleaned):
+            return
+        if any(src['speaker'] != dst['speaker'] for src, dst in zip(batch, cleaned)):
+            return
+        with self._turn_lock:
+            for src, dst in zip(batch, cleaned):
+                self._turn_cache[self._turn_key(src)] = dst
+            self._turn_cache_dirty = True
+    
+    @staticmethod
+    def _assemble(cached: List[Optional[Dict]], spans: List[tuple],
+                  span_results: List[List[Dict]]) -> List[Dict]:
+        """把缓存命中的段落和各区间的清洗结果按原顺序拼回"""
+        result = []
+        pos = 0
+        for (start, end), cleaned in zip(spans, span_results):
+            result.extend(dict(item) for item in cached[pos:start])
+            result.extend(cleaned)
+            pos = end
+        result.extend(dict(item) for item in cached[pos:])
+        return result
+    
     def _build_system_prompt(self) -> str:
         """构建系统提示词"""
         return """你是一位专业的访谈文本编辑专家，擅长将口语化的访谈录音转写稿优化为清晰、规范的书面文本。
@@ -78,7 +234,15 @@ class ZhipuTextCleaner:
         system_prompt = self._build_system_prompt()
         user_prompt = self._build_user_prompt(text)
         
+        cache_path = None
+        if self.cache_dir is not None:
+            cache_path = self._cache_path(system_prompt, user_prompt, temperature)
+            cached_text = self._read_cache(cache_path)
+            if cached_text is not None:
+                return cached_text
+        
         for attempt in range(max_retries):
+            _limiter.acquire()
             try:
                 response = self.client.chat.completions.create(
                     model=self.model,
@@ -91,6 +255,8 @@ class ZhipuTextCleaner:
                 )
                 
                 cleaned_text = response.choices[0].message.content.strip()
+                if cache_path is not None:
+                    self._write_cache(cache_path, cleaned_text)
                 return cleaned_text
                 
             except Exception as e:
@@ -113,15 +279,18 @@ class ZhipuTextCleaner:
         Returns:
             清洗后的对话列表
         """
-        cleaned_dialogues = []
         total = len(dialogues)
+        cached, spans = self._plan_batches(dialogues, batch_size)
+        total_batches = len(spans)
+        hits = total - sum(end - start for start, end in spans)
         
         print(f"\n🤖 开始使用智谱AI清洗文本（共{total}个段落）...")
+        if hits:
+            print(f"   ♻️  {hits}个段落命中缓存，无需重新清洗")
         
-        for i in range(0, total, batch_size):
-            batch = dialogues[i:i + batch_size]
-            batch_num = i // batch_size + 1
-            total_batches = (total + batch_size - 1) // batch_size
+        span_results = []
+        for batch_num, (start, end) in enumerate(spans, 1):
+            batch = dialogues[start:end]
             
             print(f"   处理批次 {batch_num}/{total_batches} ({len(batch)}个段落)...")
             
@@ -134,18 +303,74 @@ class ZhipuTextCleaner:
             if cleaned_text:
                 # 解析清洗后的文本
                 cleaned_batch = self._text_to_dialogues(cleaned_text)
-                cleaned_dialogues.extend(cleaned_batch)
+                self._remember_turns(batch, cleaned_batch)
+                span_results.append(cleaned_batch)
             else:
                 # 清洗失败，使用原文
                 print(f"   ⚠️  批次 {batch_num} 清洗失败，保留原文")
-                cleaned_dialogues.extend(batch)
+                span_results.append(batch)
+        
+        self._save_turn_cache()
+        print(f"✅ 智谱AI清洗完成！")
+        return self._assemble(cached, spans, span_results)
+    
+    def clean_dialogue_groups(self, groups: List[List[Dict]],
+                              batch_size: int = 5,
+                              max_workers: int = 4) -> List[Tuple[List[Dict], int]]:
+        """
+        一次性清洗多组对话（如多个文件各自的对话列表）
+        
+        每组仍按 batch_size 分批且批次不跨组，保证结果能按组拆回；
+        所有组的批次合在一起并发提交，省去逐文件、逐批次串行等待；
+        请求速率仍受 Config.ZHIPU_QPS 限制。
+        
+        Args:
+            groups: 多组对话列表
+            batch_size: 每批处理的对话数量
+            max_workers: 同时进行的API请求数
             
-            # 避免请求过快
-            if i + batch_size < total:
-                time.sleep(1)
+        Returns:
+            与 groups 一一对应的 (清洗后对话列表, 失败批次数)；
+            失败的批次保留原文，失败批次数大于0时该组未完全清洗
+        """
+        plans = [self._plan_batches(dialogues, batch_size) for dialogues in groups]
+        chunks = []  # (组序号, 批次对话)
+        for group_idx, (dialogues, (_, spans)) in enumerate(zip(groups, plans)):
+            for start, end in spans:
+                chunks.append((group_idx, dialogues[start:end]))
         
+        def clean_chunk(batch: List[Dict]) -> List[Dict]:
+            cleaned_text = self.clean_text(self._dialogues_to_text(batch))
+            if cleaned_text:
+                cleaned_batch = self._text_to_dialogues(cleaned_text)
+                self._remember_turns(batch, cleaned_batch)
+                return cleaned_batch
+            # 清洗失败，使用原文
+            return batch
+        
+        total = sum(len(dialogues) for dialogues in groups)
+        hits = total - sum(len(batch) for _, batch in chunks)
+        print(f"\n🤖 开始使用智谱AI清洗文本（{len(groups)}组，共{len(chunks)}个批次）...")
+        if hits:
+            print(f"   ♻️  {hits}个段落命中缓存，无需重新清洗")
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            cleaned_chunks = list(executor.map(clean_chunk, [batch for _, batch in chunks]))
+        
+        span_results = [[] for _ in groups]
+        group_failed = [0] * len(groups)
+        for (group_idx, batch), cleaned in zip(chunks, cleaned_chunks):
+            if cleaned is batch:
+                group_failed[group_idx] += 1
+            span_results[group_idx].append(cleaned)
+        
+        self._save_turn_cache()
+        failed = sum(group_failed)
+        if failed:
+            print(f"   ⚠️  {failed} 个批次清洗失败，保留原文")
         print(f"✅ 智谱AI清洗完成！")
-        return cleaned_dialogues
+        return [(self._assemble(cached, spans, cleaned), group_failed[group_idx])
+                for group_idx, ((cached, spans), cleaned) in enumerate(zip(plans, span_results))]
     
     def _dialogues_to_text(self, dialogues: List[Dict]) -> str:
         """将对话列表转换为文本"""
@@ -178,6 +403,20 @@ class ZhipuTextCleaner:
         return dialogues
 
 
+@lru_cache(maxsize=None)
+def get_zhipu_cleaner(cache_dir: Optional[str] = None) -> ZhipuTextCleaner:
+    """
+    获取共享的智谱AI清洗器（按缓存目录各保留一个实例）
+    
+    多次创建批处理器时不再重复初始化；同一缓存目录只由一个实例读写段落缓存，
+    避免多个实例互相覆盖 turns.json
+    
+    Args:
+        cache_dir: 缓存目录，为None时不缓存
+    """
+    return ZhipuTextCleaner(cache_dir=cache_dir)
+
+
 def test_zhipu_cleaner():
     """测试智谱AI清洗功能"""
     if not ZHIPU_AVAILABLE: